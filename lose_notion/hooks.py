@@ -87,7 +87,8 @@ app_license = "mit"
 # ------------
 
 # before_install = "lose_notion.install.before_install"
-# after_install = "lose_notion.install.after_install"
+after_install = "lose_notion.install.after_install"
+after_migrate = ["lose_notion.install.after_migrate"]
 
 # Uninstallation
 # ------------
@@ -148,6 +149,9 @@ scheduler_events = {
     "cron": {
         "00 10,14 * * *": [  # 9 AM and 2 PM every day
             "lose_notion.tasks.sprint_board_whatsapp.send_overdue_task_alerts"
+        ],
+        "* * * * *": [
+            "lose_notion.tasks.whatsapp_utils.flush_send_errors"
         ]
     }
 }
@@ -155,6 +159,11 @@ scheduler_events = {
 doc_events = {
     "WhatsApp Message": {
         "after_insert": "lose_notion.tasks.sprint_board_whatsapp.handle_whatsapp_task_response"
+    },
+    "User": {
+        "before_save": "lose_notion.tasks.user_utils.set_mobile_no_last10",
+        "on_update": "lose_notion.tasks.user_utils.clear_user_caches",
+        "on_trash": "lose_notion.tasks.user_utils.clear_user_caches"
     }
 }
 
@@ -0,0 +1,52 @@
+# Installation hooks
+
+import frappe
+from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+
+from lose_notion.tasks.user_utils import clear_user_caches, get_phone_key
+
+# Indexed User.mobile_no_last10 column, so the task bot can look up senders
+# by equality instead of a LIKE scan on mobile_no
+CUSTOM_FIELDS = {
+	"User": [
+		{
+			"fieldname": "mobile_no_last10",
+			"label": "Mobile No (Last 10 Digits)",
+			"fieldtype": "Data",
+			"insert_after": "mobile_no",
+			"read_only": 1,
+			"hidden": 1,
+			"search_index": 1,
+		},
+	],
+}
+
+
+def after_install():
+	# install_app marks every patch as done without running it, so the field
+	# and its backfill cannot be left to the patch
+	make_custom_fields()
+	backfill_mobile_no_last10()
+
+
+def after_migrate():
+	make_custom_fields()
+	# Rebuild cached user lookups in their current layout after code updates
+	clear_user_caches()
+
+
+def make_custom_fields():
+	"""Create the app's custom fields, or update existing ones to match"""
+	create_custom_fields(CUSTOM_FIELDS)
+
+
+def backfill_mobile_no_last10():
+	"""Fill User.mobile_no_last10 for users saved before the field existed"""
+	for user in frappe.get_all(
+		"User", filters={"mobile_no": ["is", "set"]}, fields=["name", "mobile_no"], limit_page_length=0
+	):
+		frappe.db.set_value(
+			"User", user.name, "mobile_no_last10", get_phone_key(user.mobile_no), update_modified=False
+		)
+
+	clear_user_caches()
@@ -1,9 +1,34 @@
 # Copyright (c) 2026, alfaEdge and contributors
 # For license information, please see license.txt
 
-# import frappe
+import frappe
 from frappe.model.document import Document
 
+from lose_notion.tasks.cache_utils import clear_selected_task, clear_user_tasks
+
 
 class SprintBoard(Document):
-	pass
+	def on_update(self):
+		if (
+			self.has_value_changed("status")
+			or self.has_value_changed("deadline")
+			or self.has_value_changed("assigned_to")
+			or self.has_value_changed("task_name")
+		):
+			clear_selected_task(self.name)
+			previous = self.get_doc_before_save()
+			clear_user_tasks(self.assigned_to, previous.assigned_to if previous else None)
+
+	def on_trash(self):
+		clear_selected_task(self.name)
+		clear_user_tasks(self.assigned_to)
+
+
+def on_doctype_update():
+	# Backs the overdue alert query (status, deadline < today, assignee set,
+	# not alerted today); the trailing columns are checked inside the index
+	frappe.db.add_index("Sprint Board", ["status", "deadline", "assigned_to", "last_alerted"])
+	# Backs a user's task lookups (assigned_to = ..., plus status = 'On Hold' for the
+	# count); the active list's NOT IN and ORDER BY expression still filesort
+	# within the user's rows
+	frappe.db.add_index("Sprint Board", ["assigned_to", "status", "deadline"])
@@ -1,8 +1,24 @@
 # Copyright (c) 2026, alfaEdge and Contributors
 # See license.txt
 
-# import frappe
-from frappe.tests import IntegrationTestCase
+import re
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase, UnitTestCase
+
+import lose_notion
+from lose_notion import hooks
+from lose_notion.tasks import date_utils
+from lose_notion.tasks.date_utils import _parse_date_fast, get_days_text, get_days_text_bulk
+from lose_notion.tasks.handlers.creation_handlers import (
+	get_task_lines,
+	is_task_creation_trigger,
+	parse_task_line,
+)
+from lose_notion.tasks.user_utils import _build_user_corpus, fuzzy_search_user
 
 
 # On IntegrationTestCase, the doctype test records and all
@@ -20,3 +36,253 @@ class IntegrationTestSprintBoard(IntegrationTestCase):
 	"""
 
 	pass
+
+
+class UnitTestWhatsAppEntryPoint(UnitTestCase):
+	"""
+	Unit tests for the WhatsApp Message hook entry point.
+	"""
+
+	def test_single_handler_definition(self):
+		# Scans source text, so a commented-out legacy copy (like the one that used
+		# to sit in task_deadline_alerts.py) counts as a second definition
+		app_dir = Path(lose_notion.__file__).parent
+		pattern = re.compile(r"^[#\s]*def handle_whatsapp_task_response\b", re.MULTILINE)
+		defined_in = [
+			path.relative_to(app_dir).as_posix()
+			for path in sorted(app_dir.rglob("*.py"))
+			for _ in pattern.finditer(path.read_text(encoding="utf-8"))
+		]
+		self.assertEqual(defined_in, ["tasks/sprint_board_whatsapp.py"])
+		self.assertEqual(
+			hooks.doc_events["WhatsApp Message"]["after_insert"],
+			"lose_notion.tasks.sprint_board_whatsapp.handle_whatsapp_task_response",
+		)
+
+
+class UnitTestTaskCreationTrigger(UnitTestCase):
+	"""
+	Unit tests for the text task creation triggers.
+	"""
+
+	def test_accepted_trigger_forms(self):
+		cases = [
+			("new", "new"),
+			("New", "new"),
+			("new task", "new task"),
+			("new tasks", "new tasks"),
+			("add task", "add task"),
+			("add tasks", "add tasks"),
+			("new: fix login", "new"),
+			("new task:", "new task"),
+			("new tasks: fix login", "new tasks"),
+			("add task:\nfix login", "add task"),
+			("new\nfix login ... tomorrow ... @raj", "new"),
+		]
+		for message, trigger in cases:
+			with self.subTest(message=message):
+				self.assertEqual(is_task_creation_trigger(message), trigger)
+
+	def test_rejected_messages(self):
+		for message in ("", "   ", ":", "newsletter", "add", "adding tasks", "my tasks", "renew task"):
+			with self.subTest(message=message):
+				self.assertIsNone(is_task_creation_trigger(message))
+
+	def test_task_lines_after_trigger(self):
+		cases = [
+			("new: fix login", ["fix login"]),
+			("new task:", []),
+			("new tasks\n a | b \n\n c ... d ", ["a | b", "c ... d"]),
+			("Add Task: deploy | friday", ["deploy | friday"]),
+		]
+		for message, lines in cases:
+			with self.subTest(message=message):
+				self.assertEqual(get_task_lines(message, is_task_creation_trigger(message)), lines)
+
+
+class UnitTestParseTaskLine(UnitTestCase):
+	"""
+	Unit tests for splitting a task line into name, deadline and assignee.
+	"""
+
+	def test_parts(self):
+		cases = [
+			# line, task_name, deadline_str, assignee_str
+			("Fix login | tomorrow | @raj", "Fix login", "tomorrow", "raj"),
+			("Fix login|tomorrow|raj", "Fix login", "tomorrow", "raj"),
+			("Fix login ... friday ... keshav", "Fix login", "friday", "keshav"),
+			("Fix login...friday...@keshav", "Fix login", "friday", "keshav"),
+			("Report ... @raj ... tomorrow", "Report", "tomorrow", "raj"),
+			("Fix login ... 12/25", "Fix login", "12/25", None),
+			("Fix login | @raj", "Fix login", None, "raj"),
+			("Release | Priya", "Release", None, "Priya"),
+			("  Fix login  |  next monday  ", "Fix login", "next monday", None),
+			("Ship | 25 dec | @priya", "Ship", "25 dec", "priya"),
+			("Ship | in 3 days | priya", "Ship", "in 3 days", "priya"),
+			("Call | jan 5 | priya", "Call", "jan 5", "priya"),
+			("Deploy v1.2 | friday | @raj", "Deploy v1.2", "friday", "raj"),
+			("Fix login", "Fix login", None, None),
+		]
+		for line, task_name, deadline_str, assignee_str in cases:
+			with self.subTest(line=line):
+				self.assertEqual(
+					parse_task_line(line),
+					{"task_name": task_name, "deadline_str": deadline_str, "assignee_str": assignee_str},
+				)
+
+
+class UnitTestFuzzySearchUser(UnitTestCase):
+	"""
+	Unit tests for assignee search ranking against a fixed user corpus.
+	"""
+
+	# Enabled users as returned by frappe.get_all in _build_user_corpus
+	USERS = [
+		("keshav@example.com", "Keshav Sharma", "keshav@example.com", "System User"),
+		("kesha@example.com", "Kesha Patel", "kesha@example.com", "System User"),
+		("rajesh.kumar@example.com", "Rajesh Kumar", "rajesh.kumar@example.com", "System User"),
+		("priya@example.com", "Priya Raj", "priya@example.com", "System User"),
+		("amit.verma@example.com", "Amit Verma", "av@example.com", "System User"),
+		("guest@example.com", "Guest Portal", "guest@example.com", "Website User"),
+	]
+
+	@classmethod
+	def setUpClass(cls):
+		super().setUpClass()
+		users = [
+			frappe._dict(name=name, full_name=full_name, email=email, user_type=user_type)
+			for name, full_name, email, user_type in cls.USERS
+		]
+		with patch("frappe.get_all", return_value=users):
+			cls.corpus = _build_user_corpus()
+
+	def test_ranking(self):
+		cases = [
+			# Exact full name / email (any case) returns just that user
+			("Keshav Sharma", ["keshav@example.com"]),
+			("KESHAV@example.com", ["keshav@example.com"]),
+			# Exact matches cover every enabled user, not only system users
+			("guest portal", ["guest@example.com"]),
+			# Name-part prefix plus email prefix outranks name-part prefix alone
+			("raj", ["rajesh.kumar@example.com", "priya@example.com"]),
+			(" RAJ ", ["rajesh.kumar@example.com", "priya@example.com"]),
+			# Last name prefix
+			("sharma", ["keshav@example.com"]),
+			("verma", ["amit.verma@example.com"]),
+			# Name and email-prefix substring outranks an email-prefix-only match
+			("av", ["keshav@example.com", "amit.verma@example.com"]),
+			# Typos fall back to Jaro-Winkler, closest first
+			("keshva", ["keshav@example.com", "kesha@example.com"]),
+			("priay", ["priya@example.com"]),
+			# Non-system users are never scored
+			("guest", []),
+			("zzz", []),
+			("", []),
+		]
+		for term, names in cases:
+			with self.subTest(term=term):
+				self.assertEqual([user.name for user in fuzzy_search_user(term, corpus=self.corpus)], names)
+
+	def test_limit(self):
+		self.assertEqual(
+			[user.name for user in fuzzy_search_user("raj", limit=1, corpus=self.corpus)],
+			["rajesh.kumar@example.com"],
+		)
+
+
+class UnitTestDateParsing(UnitTestCase):
+	"""
+	Unit tests for the regex date fast path and deadline display text.
+	"""
+
+	# A Thursday
+	TODAY = date(2026, 10, 15)
+
+	def test_parse_date_fast(self):
+		cases = [
+			# ISO and numeric dates are month first; a past month/day rolls over a year
+			("2024-02-10", date(2024, 2, 10)),
+			("12/25", date(2026, 12, 25)),
+			("10/15", date(2026, 10, 15)),
+			("10/14", date(2027, 10, 14)),
+			("2/10", date(2027, 2, 10)),
+			("2/10/24", date(2024, 2, 10)),
+			("2-10-2025", date(2025, 2, 10)),
+			# Month names, abbreviations and ordinal suffixes
+			("feb 10", date(2027, 2, 10)),
+			("oct 15", date(2026, 10, 15)),
+			("oct 14", date(2027, 10, 14)),
+			("sept 3", date(2027, 9, 3)),
+			("sep. 3rd", date(2027, 9, 3)),
+			("dec 25th", date(2026, 12, 25)),
+			# Relative offsets
+			("in 1 day", date(2026, 10, 16)),
+			("in 3 days", date(2026, 10, 18)),
+			("in 1 week", date(2026, 10, 22)),
+			("in 2 weeks", date(2026, 10, 29)),
+			# "next <weekday>" is always in the future, a week out on that same weekday
+			("next friday", date(2026, 10, 16)),
+			("next fri", date(2026, 10, 16)),
+			("next wednesday", date(2026, 10, 21)),
+			("next thursday", date(2026, 10, 22)),
+			# Invalid dates and unknown words fall through to the full parsers
+			("2/30", None),
+			("13/1", None),
+			("2024-02-30", None),
+			("february 29", None),
+			("foo 3", None),
+			("next monkey", None),
+			("end of sprint", None),
+		]
+		for date_str, expected in cases:
+			with self.subTest(date_str=date_str):
+				self.assertEqual(_parse_date_fast(date_str, self.TODAY), expected)
+
+	def test_datelike_gate(self):
+		for date_str in ("by friday", "12", "wed", "end of month"):
+			with self.subTest(date_str=date_str):
+				self.assertTrue(date_utils._DATELIKE_RE.search(date_str))
+		for date_str in ("asap", "soon", "whenever", "eod", "next sprint"):
+			with self.subTest(date_str=date_str):
+				self.assertIsNone(date_utils._DATELIKE_RE.search(date_str))
+
+	def test_non_datelike_text_skips_dateutil(self):
+		parse_uncached = date_utils._parse_date_cached.__wrapped__
+		with (
+			patch.object(date_utils, "_get_date_data_parser", return_value=None),
+			patch.object(date_utils.dateutil_parser, "parse") as dateutil_parse,
+		):
+			self.assertEqual(parse_uncached("asap", self.TODAY), self.TODAY)
+			dateutil_parse.assert_not_called()
+
+	def test_long_text_skips_parsers(self):
+		date_str = "fix the login page on monday and then deploy it to prod"
+		with patch.object(date_utils, "_parse_date_cached") as parse_cached:
+			self.assertEqual(date_utils.parse_date(date_str, self.TODAY), self.TODAY)
+			parse_cached.assert_not_called()
+
+	def test_get_days_text_bulk(self):
+		deadlines = [
+			date(2026, 10, 13),
+			date(2026, 10, 14),
+			self.TODAY,
+			date(2026, 10, 16),
+			date(2026, 10, 20),
+			None,
+			"2026-10-20",
+			date(2026, 11, 24),
+			date(2026, 8, 31),
+		]
+		expected = [
+			"2 days overdue",
+			"1 day overdue",
+			"Due today",
+			"Due tomorrow",
+			"Due in 5 days",
+			"No deadline",
+			"Due in 5 days",
+			"Due in 40 days",
+			"45 days overdue",
+		]
+		self.assertEqual(get_days_text_bulk(deadlines, self.TODAY), expected)
+		self.assertEqual([get_days_text(deadline, self.TODAY) for deadline in deadlines], expected)
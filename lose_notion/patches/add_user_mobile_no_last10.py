@@ -0,0 +1,10 @@
+# Backfill User.mobile_no_last10 on existing sites. The field itself comes from
+# lose_notion.install; it is created here too because post_model_sync patches
+# run before after_migrate.
+
+from lose_notion.install import backfill_mobile_no_last10, make_custom_fields
+
+
+def execute():
+	make_custom_fields()
+	backfill_mobile_no_last10()
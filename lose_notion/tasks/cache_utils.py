@@ -0,0 +1,49 @@
+# Cache Utilities for Task Bot
+# Short-lived Redis caches for Sprint Board query results
+
+import frappe
+
+USER_TASKS_KEY = "task_bot_user_tasks"
+USER_TASKS_TTL = 60  # seconds
+SELECTED_TASK_KEY = "task_bot_selected_task"
+SELECTED_TASK_TTL = 600  # seconds
+
+
+def get_cached_value(key, generator, expires_in_sec):
+    """Get a value from Redis, calling generator and caching the result on a miss
+    
+    frappe.cache().get_value() skips the generator for expiring keys,
+    so the miss is handled here.
+    
+    Args:
+        key: Cache key
+        generator: Function returning the value to cache
+        expires_in_sec: TTL for the cached value
+    """
+    value = frappe.cache().get_value(key, expires=True)
+    if value is None:
+        value = generator()
+        frappe.cache().set_value(key, value, expires_in_sec=expires_in_sec)
+    return value
+
+
+def get_user_tasks_key(assigned_to):
+    """Get the active task snapshot cache key for a user"""
+    return f"{USER_TASKS_KEY}:{assigned_to}"
+
+
+def clear_user_tasks(*users):
+    """Drop the active task snapshots of the given users"""
+    for user in users:
+        if user:
+            frappe.cache().delete_value(get_user_tasks_key(user))
+
+
+def get_selected_task_key(task_id):
+    """Get the cache key for a task row read when the task was selected"""
+    return f"{SELECTED_TASK_KEY}:{task_id}"
+
+
+def clear_selected_task(task_id):
+    """Drop the cached row of a selected task"""
+    frappe.cache().delete_value(get_selected_task_key(task_id))
@@ -2,29 +2,70 @@
 # Replaces Redis cache with database storage for persistent chat context
 
 import frappe
+import base64
 import json
+import zlib
+
+# Contexts larger than this are stored zlib-compressed (base64-wrapped)
+COMPRESS_THRESHOLD = 4096
+_COMPRESSED_PREFIX = "z:"
+
+
+def _encode_context_data(context_data):
+    """Serialize context data to compact JSON, compressing large payloads"""
+    encoded = json.dumps(context_data, default=str, separators=(",", ":"))
+    if len(encoded) > COMPRESS_THRESHOLD:
+        compressed = base64.b64encode(zlib.compress(encoded.encode())).decode()
+        encoded = _COMPRESSED_PREFIX + compressed
+    return encoded
+
+
+def _decode_context_data(context_data):
+    """Deserialize context data stored by _encode_context_data"""
+    if context_data.startswith(_COMPRESSED_PREFIX):
+        raw = zlib.decompress(base64.b64decode(context_data[len(_COMPRESSED_PREFIX):]))
+        context_data = raw.decode()
+    return json.loads(context_data)
+
+
+def _get_request_cache():
+    """Per-request memo of loaded contexts, keyed by phone number"""
+    cache = getattr(frappe.local, "whatsapp_chat_context_cache", None)
+    if cache is None:
+        cache = frappe.local.whatsapp_chat_context_cache = {}
+    return cache
 
 
 def get_context(phone_number):
     """Get context for a phone number
     
+    The context is loaded once per request; later calls (from any handler)
+    reuse it until set_context() or clear_context() changes it.
+    
     Args:
         phone_number: User's phone number
         
     Returns:
         Dict with 'context_type' and 'context_data' keys, or None if not found
     """
+    cache = _get_request_cache()
+    if phone_number in cache:
+        return cache[phone_number]
+    
     try:
         doc = frappe.get_doc("WhatsApp Chat Context", phone_number)
         context_data = doc.context_data
         if isinstance(context_data, str):
-            context_data = json.loads(context_data)
-        return {
+            context_data = _decode_context_data(context_data)
+        context = {
             "context_type": doc.context_type,
             "context_data": context_data
         }
     except frappe.DoesNotExistError:
-        return None
+        context = None
+    
+    cache[phone_number] = context
+    return context
 
 
 def set_context(phone_number, context_type, context_data):
@@ -36,10 +77,11 @@ def set_context(phone_number, context_type, context_data):
         context_data: Dict or list to store as JSON
     """
     
+    _get_request_cache().pop(phone_number, None)
     
     # Serialize context_data if needed
     if not isinstance(context_data, str):
-        context_data = json.dumps(context_data, default=str)
+        context_data = _encode_context_data(context_data)
     
     try:
         # Check if record exists
@@ -56,8 +98,6 @@ def set_context(phone_number, context_type, context_data):
                 "context_data": context_data
             })
             doc.insert(ignore_permissions=True)
-        
-        frappe.db.commit()
     except Exception as e:
         frappe.log_error(f"Error setting context for {phone_number}: {str(e)}", "Context Storage Error")
         raise
@@ -69,9 +109,10 @@ def clear_context(phone_number):
     Args:
         phone_number: User's phone number
     """
+    _get_request_cache().pop(phone_number, None)
+    
     try:
         frappe.delete_doc("WhatsApp Chat Context", phone_number, ignore_permissions=True)
-        frappe.db.commit()
     except frappe.DoesNotExistError:
         pass
 
@@ -86,13 +127,12 @@ def has_context(phone_number, context_type=None):
     Returns:
         True if context exists (and matches type if specified), False otherwise
     """
-    try:
-        doc = frappe.get_doc("WhatsApp Chat Context", phone_number)
-        if context_type:
-            return doc.context_type == context_type
-        return True
-    except frappe.DoesNotExistError:
+    context = get_context(phone_number)
+    if not context:
         return False
+    if context_type:
+        return context["context_type"] == context_type
+    return True
 
 
 def get_context_data(phone_number, context_type=None):
@@ -2,17 +2,139 @@
 # Handles date parsing and formatting
 
 import frappe
-from frappe.utils import getdate, today, add_days
+import re
+from datetime import date
+from functools import lru_cache
+from dateutil import parser as dateutil_parser
+from frappe.utils import getdate, add_days
 
-# Try to import dateparser, fallback to basic parsing if not available
-try:
-    import dateparser
-    HAS_DATEPARSER = True
-except ImportError:
-    HAS_DATEPARSER = False
+# dateparser is imported on first use (it is slow to import); False if not installed
+_dateparser = None
 
 
-def parse_date(date_str):
+def _get_dateparser():
+    """Import dateparser once on first use; None if not available (fallback to basic parsing)"""
+    global _dateparser
+    if _dateparser is None:
+        try:
+            import dateparser
+            _dateparser = dateparser
+        except ImportError:
+            _dateparser = False
+    return _dateparser or None
+
+
+# Common formats parsed directly, without dateparser
+_ISO_DATE_RE = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$")
+# Month first, matching dateparser/dateutil's default order for English
+_NUMERIC_DATE_RE = re.compile(r"^(\d{1,2})[/\-](\d{1,2})(?:[/\-](\d{2}|\d{4}))?$")
+_MONTH_DAY_RE = re.compile(r"^([a-z]+)\.?\s+(\d{1,2})(?:st|nd|rd|th)?$")
+_IN_N_DAYS_RE = re.compile(r"^in\s+(\d{1,3})\s+(day|week)s?$")
+_NEXT_WEEKDAY_RE = re.compile(r"^next\s+([a-z]+)$")
+# Only strings with a digit, month or weekday name reach dateutil's fuzzy parser
+# Longer text is not a deadline; it would only cost a fuzzy parse and a cache slot
+_MAX_DATE_STR_LEN = 40
+_DATELIKE_RE = re.compile(r"\d|jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec|mon|tue|wed|thu|fri|sat|sun")
+_WEEKDAYS = {
+    name: weekday
+    for weekday, names in enumerate((
+        ("monday", "mon"), ("tuesday", "tue", "tues"), ("wednesday", "wed"),
+        ("thursday", "thu", "thur", "thurs"), ("friday", "fri"),
+        ("saturday", "sat"), ("sunday", "sun")
+    ))
+    for name in names
+}
+_MONTHS = {
+    name: month
+    for month, full_name in enumerate((
+        "january", "february", "march", "april", "may", "june", "july",
+        "august", "september", "october", "november", "december"
+    ), 1)
+    for name in (full_name, full_name[:3])
+}
+_MONTHS["sept"] = 9
+
+
+def _parse_date_fast(date_str, today_date):
+    """Parse common date formats with regexes; None if the string needs a full parser
+    
+    Handles "2024-02-10", "2/10", "2/10/24", "feb 10", "in 3 days", "in 2 weeks"
+    and "next friday". Dates without a year that have already passed
+    roll over to next year, like dateparser's PREFER_DATES_FROM future.
+    """
+    try:
+        match = _ISO_DATE_RE.match(date_str)
+        if match:
+            return date(*map(int, match.groups()))
+        
+        match = _NUMERIC_DATE_RE.match(date_str)
+        if match:
+            month, day, year = match.groups()
+            if year:
+                year = int(year)
+                return date(year + 2000 if year < 100 else year, int(month), int(day))
+            return _next_month_day(int(month), int(day), today_date)
+        
+        match = _MONTH_DAY_RE.match(date_str)
+        if match and match.group(1) in _MONTHS:
+            return _next_month_day(_MONTHS[match.group(1)], int(match.group(2)), today_date)
+    except ValueError:
+        # Out-of-range day/month (e.g. 2/30); let the full parsers decide
+        return None
+    
+    match = _IN_N_DAYS_RE.match(date_str)
+    if match:
+        count, unit = match.groups()
+        return add_days(today_date, int(count) * (7 if unit == "week" else 1))
+    
+    match = _NEXT_WEEKDAY_RE.match(date_str)
+    if match and match.group(1) in _WEEKDAYS:
+        weekday = _WEEKDAYS[match.group(1)]
+        return add_days(today_date, (weekday - today_date.weekday() - 1) % 7 + 1)
+    
+    return None
+
+
+def _next_month_day(month, day, today_date):
+    """Get the next occurrence of month/day on or after today (raises ValueError if invalid)"""
+    parsed = date(today_date.year, month, day)
+    if parsed < today_date:
+        parsed = date(today_date.year + 1, month, day)
+    return parsed
+
+
+@lru_cache(maxsize=1)
+def _get_date_data_parser(today_date):
+    """Get a dateparser DateDataParser for the given day, or None without dateparser
+    
+    dateparser.parse() builds a new DateDataParser whenever settings are passed;
+    this one is built once per day (RELATIVE_BASE is fixed at creation). Only
+    English is loaded, and only the relative/absolute text parsers run;
+    timestamp parsing is skipped.
+    """
+    if not _get_dateparser():
+        return None
+    
+    from dateparser.date import DateDataParser
+    return DateDataParser(languages=['en'], settings={
+        'PREFER_DATES_FROM': 'future',
+        'RELATIVE_BASE': frappe.utils.now_datetime(),
+        'PARSERS': ['relative-time', 'custom-formats', 'absolute-time']
+    })
+
+
+def as_date(value):
+    """Return value as a date, skipping getdate() when it already is one
+    
+    Date columns come back from the database as datetime.date, so this avoids
+    re-parsing in loops over task rows.
+    """
+    if type(value) is date:
+        return value
+    return getdate(value)
+
+
+def parse_date(date_str, today_date=None):
     """Parse natural language date string to Python date
     
     Handles:
@@ -20,48 +142,71 @@ def parse_date(date_str):
     - Natural language like "next friday", "in 3 days"
     - Date formats like "Feb 10", "2024-02-10"
     
-    Returns today's date if parsing fails.
+    Pass today_date when parsing many dates in one request.
+    Returns today's date if parsing fails or the text is too long to be a date.
     """
+    if today_date is None:
+        today_date = getdate()
     if not date_str:
-        return getdate(today())
+        return today_date
     
     date_str = date_str.strip().lower()
     
     # Handle common keywords
     if date_str == 'today':
-        return getdate(today())
+        return today_date
     elif date_str == 'tomorrow':
-        return add_days(getdate(today()), 1)
+        return add_days(today_date, 1)
     elif date_str == 'yesterday':
-        return add_days(getdate(today()), -1)
+        return add_days(today_date, -1)
+    
+    # Bound the parser work and keep free text out of the lru_cache
+    if len(date_str) > _MAX_DATE_STR_LEN:
+        return today_date
+    
+    return _parse_date_cached(date_str, today_date)
+
+
+@lru_cache(maxsize=2048)
+def _parse_date_cached(date_str, today_date):
+    """Parse a lowercased, non-keyword date string with dateparser/dateutil
+    
+    Cached per worker. today_date is part of the key, so relative phrases like
+    "next friday" are re-parsed once the day changes.
+    """
+    parsed = _parse_date_fast(date_str, today_date)
+    if parsed:
+        return parsed
     
     # Try dateparser if available
-    if HAS_DATEPARSER:
+    date_data_parser = _get_date_data_parser(today_date)
+    if date_data_parser:
         try:
-            parsed = dateparser.parse(date_str, settings={
-                'PREFER_DATES_FROM': 'future',
-                'RELATIVE_BASE': frappe.utils.now_datetime()
-            })
+            parsed = date_data_parser.get_date_data(date_str)["date_obj"]
             if parsed:
                 return getdate(parsed)
         except Exception:
             pass
     
-    # Fallback to dateutil
+    # Fallback to dateutil; fuzzy parsing of arbitrary text is slow, so
+    # anything that cannot hold a date goes straight to the default
+    if not _DATELIKE_RE.search(date_str):
+        return today_date
     try:
-        from dateutil import parser as date_parser
-        parsed = date_parser.parse(date_str, fuzzy=True)
+        parsed = dateutil_parser.parse(date_str, fuzzy=True)
         return getdate(parsed)
     except Exception:
         pass
     
     # Default to today
-    return getdate(today())
+    return today_date
 
 
-def format_date_display(date_obj):
+def format_date_display(date_obj, today_date=None, tomorrow_date=None):
     """Format date for user-friendly display
     
+    Pass today_date/tomorrow_date when formatting many dates in a loop.
+    
     Returns:
     - "Today" for today's date
     - "Tomorrow" for tomorrow
@@ -70,13 +215,39 @@ def format_date_display(date_obj):
     if not date_obj:
         return "Today"
     
-    today_date = getdate(today())
+    if today_date is None:
+        today_date = getdate()
+    if tomorrow_date is None:
+        tomorrow_date = add_days(today_date, 1)
+    
     if date_obj == today_date:
         return "Today"
-    elif date_obj == add_days(today_date, 1):
+    elif date_obj == tomorrow_date:
         return "Tomorrow"
     else:
-        return date_obj.strftime("%b %d")
+        return _format_month_day(date_obj)
+
+
+@lru_cache(maxsize=512)
+def _format_month_day(date_obj):
+    """Format a date as "Feb 10" (cached; strftime goes through locale lookups)"""
+    return date_obj.strftime("%b %d")
+
+
+def _format_days_diff(days_diff):
+    """Format a deadline offset in days (deadline - today) as display text"""
+    if days_diff < 0:
+        return f"{abs(days_diff)} day{'s' if abs(days_diff) > 1 else ''} overdue"
+    elif days_diff == 0:
+        return "Due today"
+    elif days_diff == 1:
+        return "Due tomorrow"
+    else:
+        return f"Due in {days_diff} days"
+
+
+# Display text for the most common offsets, built once at import
+_DAYS_TEXT = {days_diff: _format_days_diff(days_diff) for days_diff in range(-30, 31)}
 
 
 def get_days_text(deadline, today_date=None):
@@ -93,17 +264,33 @@ def get_days_text(deadline, today_date=None):
         return "No deadline"
     
     if today_date is None:
-        today_date = getdate(today())
+        today_date = getdate()
     
-    from frappe.utils import date_diff
-    deadline = getdate(deadline)
-    days_diff = date_diff(deadline, today_date)
+    # Plain ordinal arithmetic; date_diff would run getdate() on both dates again
+    days_diff = as_date(deadline).toordinal() - today_date.toordinal()
+    text = _DAYS_TEXT.get(days_diff)
+    return text if text is not None else _format_days_diff(days_diff)
+
+
+def get_days_text_bulk(deadlines, today_date=None):
+    """Get days text for many deadlines in one pass
     
-    if days_diff < 0:
-        return f"{abs(days_diff)} day{'s' if abs(days_diff) > 1 else ''} overdue"
-    elif days_diff == 0:
-        return "Due today"
-    elif days_diff == 1:
-        return "Due tomorrow"
-    else:
-        return f"Due in {days_diff} days"
+    Same output as calling get_days_text() per deadline, but today is resolved
+    once and common offsets come from a precomputed table.
+    
+    Returns:
+        List of strings aligned with deadlines
+    """
+    if today_date is None:
+        today_date = getdate()
+    
+    today_ord = today_date.toordinal()
+    texts = []
+    for deadline in deadlines:
+        if not deadline:
+            texts.append("No deadline")
+            continue
+        days_diff = as_date(deadline).toordinal() - today_ord
+        text = _DAYS_TEXT.get(days_diff)
+        texts.append(text if text is not None else _format_days_diff(days_diff))
+    return texts
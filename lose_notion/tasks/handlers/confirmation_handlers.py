@@ -2,15 +2,28 @@
 # Handles task confirmation, change deadline, and user selection
 
 import frappe
-from frappe.utils import getdate, now_datetime
+from frappe.utils import add_days, getdate, now_datetime
 import json
 
 from ..whatsapp_utils import send_reply, send_interactive_message
 from ..date_utils import format_date_display, parse_date
 from ..user_utils import get_user_by_phone
 from ..context_storage import get_context_data, set_context, clear_context
+from ..cache_utils import clear_user_tasks
 from .task_handlers import send_my_tasks
 
+# Confirmation buttons never change, so they are serialized once at import
+_CONFIRM_BUTTONS_JSON = json.dumps([
+    {"id": "CONFIRM_TASKS", "title": "✅ Confirm All"},
+    {"id": "CHANGE_DEADLINE", "title": "📅 Change Deadline"},
+    {"id": "CANCEL_TASKS", "title": "❌ Cancel"}
+])
+_CONFIRM_BUTTONS_ADD_ANOTHER_JSON = json.dumps([
+    {"id": "CONFIRM_TASKS", "title": "✅ Confirm All"},
+    {"id": "ADD_ANOTHER_TASK", "title": "➕ Add Another"},
+    {"id": "CHANGE_DEADLINE", "title": "📅 Change Deadline"}
+])
+
 
 def show_task_confirmation(tasks, from_number, whatsapp_account, show_add_another=False):
     """Show task confirmation with preview
@@ -34,13 +47,16 @@ def show_task_confirmation(tasks, from_number, whatsapp_account, show_add_anothe
     # Store in database instead of cache
     set_context(from_number, "pending_tasks", serializable_tasks)
     
-    task_list = ""
+    today_date = getdate()
+    tomorrow_date = add_days(today_date, 1)
+    lines = []
     for idx, task in enumerate(tasks, 1):
         deadline = task["deadline"]
         if isinstance(deadline, str):
             deadline = getdate(deadline)
-        deadline_display = format_date_display(deadline)
-        task_list += f"{idx}. {task['task_name']}\n   📅 {deadline_display} | 👤 {task['assignee_display']}\n\n"
+        deadline_display = format_date_display(deadline, today_date, tomorrow_date)
+        lines.append(f"{idx}. {task['task_name']}\n   📅 {deadline_display} | 👤 {task['assignee_display']}\n\n")
+    task_list = "".join(lines)
     
     message = (
         f"📝 *Creating {len(tasks)} task{'s' if len(tasks) > 1 else ''}:*\n\n"
@@ -48,18 +64,7 @@ def show_task_confirmation(tasks, from_number, whatsapp_account, show_add_anothe
     )
     
     # Buttons: Confirm, Change Deadline, Cancel (or + Add Another)
-    if show_add_another:
-        buttons = [
-            {"id": "CONFIRM_TASKS", "title": "✅ Confirm All"},
-            {"id": "ADD_ANOTHER_TASK", "title": "➕ Add Another"},
-            {"id": "CHANGE_DEADLINE", "title": "📅 Change Deadline"}
-        ]
-    else:
-        buttons = [
-            {"id": "CONFIRM_TASKS", "title": "✅ Confirm All"},
-            {"id": "CHANGE_DEADLINE", "title": "📅 Change Deadline"},
-            {"id": "CANCEL_TASKS", "title": "❌ Cancel"}
-        ]
+    buttons = _CONFIRM_BUTTONS_ADD_ANOTHER_JSON if show_add_another else _CONFIRM_BUTTONS_JSON
     
     send_interactive_message(from_number, message, buttons, whatsapp_account)
 
@@ -88,8 +93,9 @@ def handle_task_confirmation(action, from_number, whatsapp_account):
                 if isinstance(deadline, str):
                     deadline = getdate(deadline)
                 
-                # Create Sprint Board document
-                sprint_task = frappe.get_doc({
+                # Inserted one by one so the doctype's hooks, version tracking and
+                # other apps' doc_events all run (bulk_insert would skip them)
+                frappe.get_doc({
                     "doctype": "Sprint Board",
                     "task_name": task["task_name"],
                     "status": "Not Started",
@@ -97,16 +103,11 @@ def handle_task_confirmation(action, from_number, whatsapp_account):
                     "deadline": deadline,
                     "created_by": created_by,
                     "created_on": now_datetime()
-                })
-                sprint_task.insert(ignore_permissions=True)
-            
-            frappe.db.commit()
+                }).insert(ignore_permissions=True)
             
             clear_context(from_number)
             
-            task_list = ""
-            for idx, task in enumerate(tasks, 1):
-                task_list += f"{idx}. {task['task_name']} ⚫\n"
+            task_list = "".join(f"{idx}. {task['task_name']} ⚫\n" for idx, task in enumerate(tasks, 1))
             
             send_reply(
                 from_number,
@@ -162,13 +163,16 @@ def handle_change_deadline(from_number, whatsapp_account):
     # Store deadline edit state with tasks
     set_context(from_number, "deadline_edit", {"mode": "selecting", "tasks": tasks})
     
-    task_list = ""
+    today_date = getdate()
+    tomorrow_date = add_days(today_date, 1)
+    lines = []
     for idx, task in enumerate(tasks, 1):
         deadline = task["deadline"]
         if isinstance(deadline, str):
             deadline = getdate(deadline)
-        deadline_display = format_date_display(deadline)
-        task_list += f"{idx}. {task['task_name']} (📅 {deadline_display})\n"
+        deadline_display = format_date_display(deadline, today_date, tomorrow_date)
+        lines.append(f"{idx}. {task['task_name']} (📅 {deadline_display})\n")
+    task_list = "".join(lines)
     
     message = (
         f"📅 *Change Deadline*\n\n"
@@ -313,16 +317,19 @@ def _update_existing_task_deadline(task_id, message, from_number, whatsapp_accou
     
     try:
         # Get task name for confirmation
-        task_name = frappe.db.get_value("Sprint Board", task_id, "task_name")
+        task = frappe.db.get_value("Sprint Board", task_id, ["task_name", "assigned_to"], as_dict=True)
         
-        if not task_name:
+        if not task:
             send_reply(from_number, "❌ Task not found.", whatsapp_account)
             clear_context(from_number)
             return True
         
+        task_name = task.task_name
+        
         # Update task deadline in database
         frappe.db.set_value("Sprint Board", task_id, "deadline", new_deadline)
-        frappe.db.commit()
+        # set_value skips the Sprint Board hooks, so drop the cached task lists here
+        clear_user_tasks(task.assigned_to)
         
         # Clear context
         clear_context(from_number)
@@ -4,45 +4,67 @@
 import frappe
 from frappe.utils import now_datetime, getdate
 import json
+import re
 
 from ..whatsapp_utils import send_reply, send_interactive_message
 from ..date_utils import parse_date, format_date_display
-from ..user_utils import get_user_by_phone, fuzzy_search_user
+from ..user_utils import get_user_by_phone, fuzzy_search_user, fuzzy_search_users
 from ..context_storage import get_context_data, set_context, clear_context, has_context
 from .confirmation_handlers import show_task_confirmation, handle_ambiguous_users
 
 # Constants
-TASK_CREATE_TRIGGERS = ['add tasks', 'add task', 'new task', 'new tasks', 'new']
-MY_TASKS_TRIGGERS = ['my tasks', 'my task', 'my']
+TASK_CREATE_TRIGGERS = frozenset({'add tasks', 'add task', 'new task', 'new tasks', 'new'})
+MY_TASKS_TRIGGERS = frozenset({'my tasks', 'my task', 'my'})
+
+# Task creation triggers grouped by first word, longest first within each group
+# so "new tasks" wins over "new task"
+_TASK_CREATE_BY_FIRST_WORD = {}
+for _trigger in sorted(TASK_CREATE_TRIGGERS, key=len, reverse=True):
+    _TASK_CREATE_BY_FIRST_WORD.setdefault(_trigger.split()[0], []).append(_trigger)
+
+# First word of a message; a colon also ends it, so "new: ..." starts with "new"
+_FIRST_WORD_RE = re.compile(r"[^\s:]+")
+
+# Task line separators; surrounding whitespace is consumed by the split itself
+_DOTS_SEP_RE = re.compile(r"\s*\.\.\.\s*")
+_PIPE_SEP_RE = re.compile(r"\s*\|\s*")
 
 
 # ============================================
 # TEXT-BASED TASK CREATION (Power Users)
 # ============================================
 
-def is_task_creation_trigger(message):
-    """Check if message starts with a task creation trigger keyword"""
-    message_lower = message.strip().lower()
-    for trigger in TASK_CREATE_TRIGGERS:
+def is_task_creation_trigger(message, message_lower=None):
+    """Check if message starts with a task creation trigger keyword
+    
+    The trigger may be followed by a colon ("new: fix login", "new task:").
+    Pass message_lower (the stripped, lowered message) when the caller has
+    already computed it.
+    """
+    if message_lower is None:
+        message_lower = message.strip().lower()
+    first_word = _FIRST_WORD_RE.match(message_lower)
+    if not first_word:
+        return None
+    for trigger in _TASK_CREATE_BY_FIRST_WORD.get(first_word.group(), ()):
         if message_lower.startswith(trigger):
             return trigger
     return None
 
 
 def get_task_lines(message, trigger):
-    """Extract task lines from message after removing trigger keyword"""
-    message_lower = message.lower()
-    trigger_pos = message_lower.find(trigger)
-    if trigger_pos == -1:
-        return []
+    """Extract task lines from message after removing trigger keyword
     
-    remaining = message[trigger_pos + len(trigger):].strip()
+    The trigger is matched at the start of the stripped message (see
+    is_task_creation_trigger), so it is sliced off by length, along with a
+    colon right after it.
+    """
+    remaining = message.strip()[len(trigger):].strip().removeprefix(":").strip()
     
     if not remaining:
         return []
     
-    lines = [line.strip() for line in remaining.split('\n') if line.strip()]
-    return lines
+    return [line for line in map(str.strip, remaining.splitlines()) if line]
 
 
 def parse_task_line(line):
@@ -55,18 +77,15 @@ def parse_task_line(line):
     The assignee can optionally have @ prefix.
     """
     # Determine which separator to use
-    if '...' in line:
-        parts = [p.strip() for p in line.split('...')]
-    else:
-        parts = [p.strip() for p in line.split('|')]
+    separator_re = _DOTS_SEP_RE if '...' in line else _PIPE_SEP_RE
+    parts = separator_re.split(line.strip())
     
-    task_name = parts[0] if parts else ""
+    task_name = parts[0]
     deadline_str = None
     assignee_str = None
     
     for part in parts[1:]:
-        part = part.strip()
-        if part.startswith('@'):
+        if part[:1] == '@':
             assignee_str = part[1:]
         elif _looks_like_assignee(part):
             # If it doesn't look like a date, treat as assignee
@@ -124,9 +143,9 @@ def _looks_like_assignee(text):
 
 
 
-def handle_task_creation_trigger(message, from_number, whatsapp_account):
+def handle_task_creation_trigger(message, from_number, whatsapp_account, message_lower=None):
     """Handle text-based task creation trigger (power users)"""
-    trigger = is_task_creation_trigger(message)
+    trigger = is_task_creation_trigger(message, message_lower)
     if not trigger:
         return False
     
@@ -149,16 +168,21 @@ def handle_task_creation_trigger(message, from_number, whatsapp_account):
     parsed_tasks = []
     needs_user_confirmation = []
     
-    for line in task_lines:
-        parsed = parse_task_line(line)
-        
+    # Resolve every mentioned assignee in one batch
+    parsed_lines = [parse_task_line(line) for line in task_lines]
+    assignee_matches = fuzzy_search_users(
+        [parsed["assignee_str"] for parsed in parsed_lines if parsed["assignee_str"]]
+    )
+    
+    today_date = getdate()
+    for parsed in parsed_lines:
         if not parsed["task_name"]:
             continue
         
-        deadline = parse_date(parsed["deadline_str"])
+        deadline = parse_date(parsed["deadline_str"], today_date)
         
         if parsed["assignee_str"]:
-            matches = fuzzy_search_user(parsed["assignee_str"])
+            matches = assignee_matches[parsed["assignee_str"]]
             if len(matches) == 1:
                 assignee = matches[0]["name"]
                 assignee_display = matches[0]["full_name"] or matches[0]["email"]
@@ -253,7 +277,7 @@ def handle_pending_task_input(message, from_number, whatsapp_account):
         return True
     
     # Parse task lines
-    lines = [line.strip() for line in message.split('\n') if line.strip()]
+    lines = [line for line in map(str.strip, message.splitlines()) if line]
     if not lines:
         send_reply(from_number, "❌ No tasks provided. Please try again.", whatsapp_account)
         return True
@@ -261,16 +285,21 @@ def handle_pending_task_input(message, from_number, whatsapp_account):
     parsed_tasks = []
     needs_user_confirmation = []
     
-    for line in lines:
-        parsed = parse_task_line(line)
-        
+    # Resolve every mentioned assignee in one batch
+    parsed_lines = [parse_task_line(line) for line in lines]
+    assignee_matches = fuzzy_search_users(
+        [parsed["assignee_str"] for parsed in parsed_lines if parsed["assignee_str"]]
+    )
+    
+    today_date = getdate()
+    for parsed in parsed_lines:
         if not parsed["task_name"]:
             continue
         
-        deadline = parse_date(parsed["deadline_str"])
+        deadline = parse_date(parsed["deadline_str"], today_date)
         
         if parsed["assignee_str"]:
-            matches = fuzzy_search_user(parsed["assignee_str"])
+            matches = assignee_matches[parsed["assignee_str"]]
             if len(matches) == 1:
                 assignee = matches[0]["name"]
                 assignee_display = matches[0]["full_name"] or matches[0]["email"]
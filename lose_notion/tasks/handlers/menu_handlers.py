@@ -3,14 +3,15 @@
 
 import frappe
 import json
+from datetime import date
 
 from ..whatsapp_utils import send_reply, send_typing_indicator, send_interactive_message
 from ..user_utils import get_user_by_phone
-from ..date_utils import get_days_text
-from .task_handlers import send_task_list_with_numbers
+from ..date_utils import as_date, get_days_text
+from .task_handlers import get_status_display, send_task_list_with_numbers
 
 # Constants
-MENU_TRIGGERS = ['menu', 'help', 'start']
+MENU_TRIGGERS = frozenset({'menu', 'help', 'start'})
 GUIDE_TRIGGER = 'guide'
 
 STATUS_FILTER_TRIGGERS = {
@@ -20,20 +21,7 @@ STATUS_FILTER_TRIGGERS = {
 }
 
 # Special filter triggers (not actual status values)
-SPECIAL_FILTER_TRIGGERS = ['today', 'overdue', 'change']
-
-STATUS_DISPLAY = {
-    "Not Started": "⚫ Not Started",
-    "In Progress": "🔵 In Progress",
-    "Completed": "🟢 Completed",
-    "On Hold": "🟠 On Hold"
-}
-
-
-def get_status_display(status):
-    """Get display text with emoji for status"""
-    return STATUS_DISPLAY.get(status, status)
-
+SPECIAL_FILTER_TRIGGERS = frozenset({'today', 'overdue', 'change'})
 
 
 def handle_menu_trigger(message, from_number, whatsapp_account):
@@ -230,12 +218,12 @@ def send_guide(to_number, whatsapp_account):
 
 def send_filtered_tasks(to_number, assigned_to, status, whatsapp_account):
     """Send tasks filtered by status with status counts"""
-    from frappe.utils import getdate, today
+    from frappe.utils import getdate
     
     send_typing_indicator(to_number, whatsapp_account)
     
     try:
-        today_date = getdate(today())
+        today_date = getdate()
         
         # Get all incomplete tasks to compute status counts
         all_tasks = frappe.get_all(
@@ -258,7 +246,7 @@ def send_filtered_tasks(to_number, assigned_to, status, whatsapp_account):
         
         for task in all_tasks:
             # Check if task is overdue
-            is_overdue = task.deadline and getdate(task.deadline) < today_date
+            is_overdue = task.deadline and as_date(task.deadline) < today_date
             
             # Count all statuses
             if task.status == "On Hold":
@@ -289,13 +277,8 @@ def send_filtered_tasks(to_number, assigned_to, status, whatsapp_account):
             )
             return
         
-        # Sort by deadline
-        def sort_key(t):
-            if not t["deadline"]:
-                return "9999-99-99"
-            return str(getdate(t["deadline"]))
-        
-        task_list.sort(key=sort_key)
+        # Sort by deadline (no deadline last)
+        task_list.sort(key=lambda t: (t["deadline"] is None, t["deadline"] or date.max))
         
         # Determine exclude_status for summary
         exclude_map = {
@@ -319,12 +302,12 @@ def send_filtered_tasks(to_number, assigned_to, status, whatsapp_account):
 
 def send_today_tasks(to_number, assigned_to, whatsapp_account):
     """Send tasks due today with status counts"""
-    from frappe.utils import getdate, today
+    from frappe.utils import getdate
     
     send_typing_indicator(to_number, whatsapp_account)
     
     try:
-        today_date = getdate(today())
+        today_date = getdate()
         
         # Get all incomplete tasks to compute status counts
         all_tasks = frappe.get_all(
@@ -347,8 +330,8 @@ def send_today_tasks(to_number, assigned_to, whatsapp_account):
         
         for task in all_tasks:
             # Check if task is overdue or due today
-            is_today = task.deadline and getdate(task.deadline) == today_date
-            is_overdue = task.deadline and getdate(task.deadline) < today_date
+            is_today = task.deadline and as_date(task.deadline) == today_date
+            is_overdue = task.deadline and as_date(task.deadline) < today_date
             
             # Count all statuses
             if task.status == "On Hold":
@@ -399,12 +382,13 @@ def send_today_tasks(to_number, assigned_to, whatsapp_account):
 
 def send_overdue_tasks(to_number, assigned_to, whatsapp_account):
     """Send overdue tasks (deadline < today, not Completed or On Hold) with status counts"""
-    from frappe.utils import getdate, today, date_diff
+    from frappe.utils import getdate
     
     send_typing_indicator(to_number, whatsapp_account)
     
     try:
-        today_date = getdate(today())
+        today_date = getdate()
+        today_ord = today_date.toordinal()
         
         # Get all incomplete tasks (excluding On Hold for overdue filter)
         all_tasks = frappe.get_all(
@@ -427,7 +411,9 @@ def send_overdue_tasks(to_number, assigned_to, whatsapp_account):
         
         for task in all_tasks:
             # Check if task is overdue
-            is_overdue = task.deadline and getdate(task.deadline) < today_date
+            deadline = task.deadline and as_date(task.deadline)
+            days_overdue = today_ord - deadline.toordinal() if deadline else 0
+            is_overdue = days_overdue > 0
             
             # Count all statuses
             if task.status == "On Hold":
@@ -441,14 +427,13 @@ def send_overdue_tasks(to_number, assigned_to, whatsapp_account):
             
             # Only add to task list if overdue and not On Hold
             if is_overdue and task.status != "On Hold":
-                days_overdue = date_diff(today_date, getdate(task.deadline))
                 days_text = f"{days_overdue} day{'s' if days_overdue > 1 else ''} overdue"
                 task_list.append({
                     "task_id": task.name,
                     "task_title": task.task_name,
                     "days_text": days_text,
                     "status": task.status,
-                    "deadline": task.deadline
+                    "deadline": deadline
                 })
         
         if not task_list:
@@ -460,12 +445,7 @@ def send_overdue_tasks(to_number, assigned_to, whatsapp_account):
             return
         
         # Sort by most overdue first
-        def sort_key(t):
-            if not t["deadline"]:
-                return "0000-00-00"
-            return str(getdate(t["deadline"]))
-        
-        task_list.sort(key=sort_key)
+        task_list.sort(key=lambda t: t["deadline"])
         
         send_task_list_with_numbers(
             to_number, task_list, whatsapp_account, 
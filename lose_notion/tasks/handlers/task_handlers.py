@@ -2,29 +2,44 @@
 # Handles task selection, status updates, and task list display
 
 import frappe
-from frappe.utils import getdate, today, date_diff
+from collections import Counter
+from frappe.utils import getdate, today, now_datetime
 import json
 
 from ..whatsapp_utils import send_reply, send_typing_indicator, send_interactive_message
-from ..date_utils import get_days_text
+from ..date_utils import as_date, get_days_text, get_days_text_bulk
 from ..context_storage import get_context_data, set_context
+from ..cache_utils import (
+    USER_TASKS_TTL,
+    SELECTED_TASK_TTL,
+    get_cached_value,
+    get_user_tasks_key,
+    get_selected_task_key,
+    clear_user_tasks
+)
 
 # Constants
 MAX_WHATSAPP_LIST_ITEMS = 10
 
-STATUS_EMOJI = {
-    "Not Started": "⚫",
-    "In Progress": "🔵",
-    "Completed": "🟢",
-    "On Hold": "🟠"
-}
-
-STATUS_DISPLAY = {
-    "Not Started": "⚫ Not Started",
-    "In Progress": "🔵 In Progress",
-    "Completed": "🟢 Completed",
-    "On Hold": "🟠 On Hold"
+# (status, emoji) in the order status options are offered as buttons;
+# the emoji, display text and button title lookups are all derived from it
+STATUS_META = (
+    ("Completed", "🟢"),
+    ("In Progress", "🔵"),
+    ("On Hold", "🟠"),
+    ("Not Started", "⚫")
+)
+
+STATUS_EMOJI = {status: emoji for status, emoji in STATUS_META}
+STATUS_DISPLAY = {status: f"{emoji} {status}" for status, emoji in STATUS_META}
+STATUS_BUTTON_TITLES = {status: f"{status} {emoji}" for status, emoji in STATUS_META}
+
+# Status options (excluding the current status) built once at import time
+_STATUS_OPTIONS = {
+    current: [(status, title) for status, title in STATUS_BUTTON_TITLES.items() if status != current][:3]
+    for current in STATUS_BUTTON_TITLES
 }
+_DEFAULT_STATUS_OPTIONS = list(STATUS_BUTTON_TITLES.items())[:3]
 
 
 def get_status_emoji(status):
@@ -44,7 +59,7 @@ def handle_task_selection(task_id, from_number, whatsapp_account):
         task_data = frappe.db.get_value(
             "Sprint Board",
             task_id,
-            ["task_name", "status", "deadline"],
+            ["task_name", "status", "assigned_to"],
             as_dict=True
         )
         
@@ -54,24 +69,22 @@ def handle_task_selection(task_id, from_number, whatsapp_account):
         
         current_status = task_data.status
         
+        # Keep the row for the status button tap that usually follows
+        frappe.cache().set_value(
+            get_selected_task_key(task_id),
+            {"task_name": task_data.task_name, "assigned_to": task_data.assigned_to},
+            expires_in_sec=SELECTED_TASK_TTL
+        )
+        
         # Store task_id wrapped in dict for "change" command
         # JSON field requires object, not bare string
         set_context(from_number, "deadline_edit_task", {"task_id": task_id})
 
         
-        # All status options with display names
-        all_statuses = [
-            {"id": f"STATUS:Completed:{task_id}", "title": "Completed 🟢", "status": "Completed"},
-            {"id": f"STATUS:In Progress:{task_id}", "title": "In Progress 🔵", "status": "In Progress"},
-            {"id": f"STATUS:On Hold:{task_id}", "title": "On Hold 🟠", "status": "On Hold"},
-            {"id": f"STATUS:Not Started:{task_id}", "title": "Not Started ⚫", "status": "Not Started"}
-        ]
-        
         status_buttons = [
-            {"id": s["id"], "title": s["title"]} 
-            for s in all_statuses 
-            if s["status"] != current_status
-        ][:3]
+            {"id": f"STATUS:{status}:{task_id}", "title": title}
+            for status, title in _STATUS_OPTIONS.get(current_status, _DEFAULT_STATUS_OPTIONS)
+        ]
         
         message_body = (
             f"📋 *Task:* {task_data.task_name}\n"
@@ -91,26 +104,37 @@ def handle_status_update(task_id, new_status, from_number, whatsapp_account):
     """Update the task status based on user selection"""
     
     try:
-        task_data = frappe.db.get_value(
-            "Sprint Board",
-            task_id,
-            ["task_name", "status", "assigned_to"],
-            as_dict=True
+        # Usually cached by handle_task_selection moments earlier
+        task_data = frappe.cache().get_value(get_selected_task_key(task_id), expires=True)
+        if task_data:
+            task_data = frappe._dict(task_data)
+        else:
+            rows = frappe.db.sql(
+                "SELECT task_name, assigned_to FROM `tabSprint Board` WHERE name = %s",
+                (task_id,),
+                as_dict=True
+            )
+            
+            if not rows:
+                send_reply(from_number, "❌ Task not found.", whatsapp_account)
+                return
+            
+            task_data = rows[0]
+        
+        # Update status and completed_date (auto-set when completed) in one statement
+        completed_date = today() if new_status == "Completed" else None
+        frappe.db.sql(
+            """
+            UPDATE `tabSprint Board`
+            SET status = %s, completed_date = %s, modified = %s
+            WHERE name = %s
+            """,
+            (new_status, completed_date, now_datetime(), task_id)
         )
+        # Raw SQL skips the Sprint Board hooks, so update the cached task lists here
+        _apply_status_to_cached_tasks(task_data.assigned_to, task_id, new_status)
         
-        if not task_data:
-            send_reply(from_number, "❌ Task not found.", whatsapp_account)
-            return
-        
-        # Update status
-        frappe.db.set_value("Sprint Board", task_id, "status", new_status)
-        
-        # Auto-set completed_date if marking as completed
-        if new_status == "Completed":
-            frappe.db.set_value("Sprint Board", task_id, "completed_date", today())
-        
-        frappe.db.commit()
-        
+        # Buffered in the outbox and sent once the update is committed
         send_reply(
             from_number,
             f"✅ *{task_data.task_name}*\n\nStatus updated to {get_status_display(new_status)}",
@@ -125,6 +149,112 @@ def handle_status_update(task_id, new_status, from_number, whatsapp_account):
         send_reply(from_number, "❌ An error occurred. Please try again.", whatsapp_account)
 
 
+def _get_active_tasks(assigned_to):
+    """Get a user's active tasks and their On Hold count
+    
+    On Hold tasks are filtered out in SQL and only counted, so they never
+    reach Python. The result is cached in Redis for a short time and cleared
+    whenever one of the user's tasks changes.
+    
+    Returns:
+        Tuple of (tasks, on_hold_count)
+    """
+    return get_cached_value(
+        get_user_tasks_key(assigned_to),
+        lambda: _load_active_tasks(assigned_to),
+        USER_TASKS_TTL
+    )
+
+
+def _load_active_tasks(assigned_to):
+    """Query a user's active tasks and On Hold count (see _get_active_tasks)
+    
+    Tasks come back in display order: by deadline, so overdue tasks are first,
+    with tasks that have no deadline last. The (assigned_to, status, deadline)
+    index narrows the scan to the user's rows and serves the On Hold count.
+    The status NOT IN range and the ORDER BY expression still leave a small
+    filesort over that user's tasks.
+    """
+    on_hold_count = frappe.db.count("Sprint Board", {"assigned_to": assigned_to, "status": "On Hold"})
+    tasks = frappe.db.sql("""
+        SELECT name, task_name, deadline, status
+        FROM `tabSprint Board`
+        WHERE assigned_to = %(assigned_to)s
+            AND status NOT IN ('Completed', 'On Hold')
+        ORDER BY deadline IS NULL, deadline
+    """, {"assigned_to": assigned_to}, as_dict=True)
+    return tasks, on_hold_count
+
+
+def _apply_status_to_cached_tasks(assigned_to, task_id, new_status):
+    """Apply a status change to the user's cached active task list in place
+    
+    Lets send_remaining_tasks reuse the cached list after a status update
+    instead of querying again. The entry is dropped when the task is not in it
+    (e.g. it was On Hold), so the next read reloads from the database.
+    """
+    cache_key = get_user_tasks_key(assigned_to)
+    cached = frappe.cache().get_value(cache_key, expires=True)
+    if cached is None:
+        return
+    
+    tasks, on_hold_count = cached
+    task = next((t for t in tasks if t.name == task_id), None)
+    if task is None:
+        clear_user_tasks(assigned_to)
+        return
+    
+    if new_status in ("Completed", "On Hold"):
+        tasks = [t for t in tasks if t.name != task_id]
+        if new_status == "On Hold":
+            on_hold_count += 1
+    else:
+        task.status = new_status
+    
+    frappe.cache().set_value(cache_key, (tasks, on_hold_count), expires_in_sec=USER_TASKS_TTL)
+
+
+def _classify_tasks(tasks, today_date, on_hold_count=0):
+    """Build the active task list and status counts in a single pass
+    
+    Tasks are expected in display order (see _load_active_tasks); deadlines
+    are compared as date ordinals.
+    
+    Returns:
+        Tuple of (task_list, status_counts)
+    """
+    today_ord = today_date.toordinal()
+    # Summary bucket per task ("overdue" or the status), counted once at the end
+    buckets = []
+    task_list = []
+    deadlines = []
+    
+    for task in tasks:
+        status = task.status
+        is_overdue = bool(task.deadline) and as_date(task.deadline).toordinal() < today_ord
+        buckets.append("overdue" if is_overdue else status)
+        
+        deadlines.append(task.deadline)
+        task_list.append({
+            "task_id": task.name,
+            "task_title": task.task_name,
+            "status": status
+        })
+    
+    for task_entry, days_text in zip(task_list, get_days_text_bulk(deadlines, today_date)):
+        task_entry["days_text"] = days_text
+    
+    counts = Counter(buckets)
+    status_counts = {
+        "not_started": counts["Not Started"],
+        "in_progress": counts["In Progress"],
+        "overdue": counts["overdue"],
+        "on_hold": on_hold_count
+    }
+    
+    return task_list, status_counts
+
+
 def send_remaining_tasks(to_number, assigned_to, whatsapp_account):
     """Send remaining incomplete tasks after a status update
     
@@ -133,74 +263,26 @@ def send_remaining_tasks(to_number, assigned_to, whatsapp_account):
     """
     
     try:
-        today_date = getdate(today())
+        today_date = getdate()
         
         # Get ALL remaining incomplete tasks (not just overdue)
-        remaining = frappe.get_all(
-            "Sprint Board",
-            filters={
-                "status": ["!=", "Completed"],
-                "assigned_to": assigned_to
-            },
-            fields=["name", "task_name", "deadline", "status"]
-        )
+        remaining, on_hold_count = _get_active_tasks(assigned_to)
         
         if not remaining:
-            send_reply(
-                to_number, 
-                "🎉 *All tasks completed!*\n\nYou're all caught up!", 
-                whatsapp_account
-            )
+            if on_hold_count:
+                msg = "✅ No active tasks remaining!"
+                msg += f"\n\n🟠 {on_hold_count} task{'s' if on_hold_count > 1 else ''} on hold"
+                send_reply(to_number, msg, whatsapp_account)
+            else:
+                send_reply(
+                    to_number, 
+                    "🎉 *All tasks completed!*\n\nYou're all caught up!", 
+                    whatsapp_account
+                )
             return
         
-        # Separate On Hold tasks from active tasks and count statuses
-        task_list = []
-        status_counts = {
-            "not_started": 0,
-            "in_progress": 0,
-            "overdue": 0,
-            "on_hold": 0
-        }
-        
-        for task in remaining:
-            if task.status == "On Hold":
-                status_counts["on_hold"] += 1
-                continue
-            
-            # Check if task is overdue
-            is_overdue = task.deadline and getdate(task.deadline) < today_date
-            if is_overdue:
-                status_counts["overdue"] += 1
-            elif task.status == "Not Started":
-                status_counts["not_started"] += 1
-            elif task.status == "In Progress":
-                status_counts["in_progress"] += 1
-            
-            days_text = get_days_text(task.deadline, today_date)
-            task_list.append({
-                "task_id": task.name,
-                "task_title": task.task_name,
-                "days_text": days_text,
-                "status": task.status,
-                "deadline": task.deadline
-            })
-        
-        if not task_list:
-            msg = "✅ No active tasks remaining!"
-            if status_counts["on_hold"] > 0:
-                msg += f"\n\n🟠 {status_counts['on_hold']} task{'s' if status_counts['on_hold'] > 1 else ''} on hold"
-            send_reply(to_number, msg, whatsapp_account)
-            return
-        
-        # Sort: overdue first, then by deadline
-        def sort_key(t):
-            if not t["deadline"]:
-                return (1, "9999-99-99")
-            deadline = getdate(t["deadline"])
-            is_overdue = deadline < today_date
-            return (0 if is_overdue else 1, str(deadline))
-        
-        task_list.sort(key=sort_key)
+        # Count statuses and sort
+        task_list, status_counts = _classify_tasks(remaining, today_date, on_hold_count)
         
         send_task_list_with_numbers(to_number, task_list, whatsapp_account, "Remaining Tasks", status_counts=status_counts)
             
@@ -215,71 +297,22 @@ def send_my_tasks(to_number, assigned_to, whatsapp_account):
     """
     
     try:
-        today_date = getdate(today())
+        today_date = getdate()
         
         # Get all incomplete tasks for user
-        tasks = frappe.get_all(
-            "Sprint Board",
-            filters={
-                "status": ["!=", "Completed"],
-                "assigned_to": assigned_to
-            },
-            fields=["name", "task_name", "deadline", "status"]
-        )
+        tasks, on_hold_count = _get_active_tasks(assigned_to)
         
         if not tasks:
-            send_reply(to_number, "✅ You have no pending tasks! Great job! 🎉", whatsapp_account)
+            if on_hold_count:
+                msg = "✅ No active tasks!"
+                msg += f"\n\n🟠 {on_hold_count} task{'s' if on_hold_count > 1 else ''} on hold"
+                send_reply(to_number, msg, whatsapp_account)
+            else:
+                send_reply(to_number, "✅ You have no pending tasks! Great job! 🎉", whatsapp_account)
             return
         
-        # Separate On Hold tasks from active tasks and count statuses
-        my_tasks = []
-        status_counts = {
-            "not_started": 0,
-            "in_progress": 0,
-            "overdue": 0,
-            "on_hold": 0
-        }
-        
-        for task in tasks:
-            if task.status == "On Hold":
-                status_counts["on_hold"] += 1
-                continue
-            
-            # Check if task is overdue
-            is_overdue = task.deadline and getdate(task.deadline) < today_date
-            if is_overdue:
-                status_counts["overdue"] += 1
-            elif task.status == "Not Started":
-                status_counts["not_started"] += 1
-            elif task.status == "In Progress":
-                status_counts["in_progress"] += 1
-            
-            days_text = get_days_text(task.deadline, today_date)
-            
-            my_tasks.append({
-                "task_id": task.name,
-                "task_title": task.task_name,
-                "days_text": days_text,
-                "status": task.status,
-                "deadline": task.deadline
-            })
-        
-        if not my_tasks:
-            msg = "✅ No active tasks!"
-            if status_counts["on_hold"] > 0:
-                msg += f"\n\n🟠 {status_counts['on_hold']} task{'s' if status_counts['on_hold'] > 1 else ''} on hold"
-            send_reply(to_number, msg, whatsapp_account)
-            return
-        
-        # Sort: overdue first, then by deadline
-        def sort_key(t):
-            if not t["deadline"]:
-                return (1, "9999-99-99")
-            deadline = getdate(t["deadline"])
-            is_overdue = deadline < today_date
-            return (0 if is_overdue else 1, str(deadline))
-        
-        my_tasks.sort(key=sort_key)
+        # Count statuses and sort
+        my_tasks, status_counts = _classify_tasks(tasks, today_date, on_hold_count)
         
         send_task_list_with_numbers(to_number, my_tasks, whatsapp_account, "Your Pending Tasks", status_counts=status_counts)
         
@@ -296,10 +329,10 @@ def handle_more_command(message, from_number, whatsapp_account):
     
     # Get pagination state from consolidated context
     context = get_context_data(from_number, "task_list_context")
-    if not context or not context.get("tasks"):
+    if not context or not context.get("task_ids"):
         return False
     
-    task_list = context["tasks"]
+    task_ids = context["task_ids"]
     current_page = context.get("page", 0)
     status_counts = context.get("status_counts", {})
     exclude_status = context.get("exclude_status")
@@ -307,7 +340,7 @@ def handle_more_command(message, from_number, whatsapp_account):
     
     # Move to next page
     next_page = current_page + 1
-    _send_paginated_task_list(from_number, task_list, whatsapp_account, header_text, status_counts, exclude_status, next_page)
+    _send_paginated_task_list(from_number, task_ids, whatsapp_account, header_text, status_counts, exclude_status, next_page, context=context)
     return True
 
 
@@ -315,11 +348,11 @@ def handle_load_more_button(from_number, whatsapp_account):
     """Handle Load More button press to show next page of tasks"""
     # Get pagination state from consolidated context
     context = get_context_data(from_number, "task_list_context")
-    if not context or not context.get("tasks"):
+    if not context or not context.get("task_ids"):
         send_reply(from_number, "❌ No task list found. Please request your tasks again.", whatsapp_account)
         return
     
-    task_list = context["tasks"]
+    task_ids = context["task_ids"]
     current_page = context.get("page", 0)
     status_counts = context.get("status_counts", {})
     exclude_status = context.get("exclude_status")
@@ -327,7 +360,7 @@ def handle_load_more_button(from_number, whatsapp_account):
     
     # Move to next page
     next_page = current_page + 1
-    _send_paginated_task_list(from_number, task_list, whatsapp_account, header_text, status_counts, exclude_status, next_page)
+    _send_paginated_task_list(from_number, task_ids, whatsapp_account, header_text, status_counts, exclude_status, next_page, context=context)
 
 
 def handle_number_selection(message, from_number, whatsapp_account):
@@ -341,22 +374,21 @@ def handle_number_selection(message, from_number, whatsapp_account):
     
     # Get task list from consolidated context
     context = get_context_data(from_number, "task_list_context")
-    if not context or not context.get("tasks"):
+    if not context or not context.get("task_ids"):
         return False
     
-    task_list = context["tasks"]
+    task_ids = context["task_ids"]
     
     try:
         task_index = task_number - 1  # Convert to 0-indexed
         
-        if 0 <= task_index < len(task_list):
-            task_id = task_list[task_index]["task_id"]
-            handle_task_selection(task_id, from_number, whatsapp_account)
+        if 0 <= task_index < len(task_ids):
+            handle_task_selection(task_ids[task_index], from_number, whatsapp_account)
             return True
         else:
             send_reply(
                 from_number,
-                f"❌ Invalid number. Please enter a number between 1 and {len(task_list)}.",
+                f"❌ Invalid number. Please enter a number between 1 and {len(task_ids)}.",
                 whatsapp_account
             )
             return True
@@ -382,29 +414,59 @@ def send_task_list_with_numbers(to_number, task_list, whatsapp_account, header_t
         send_reply(to_number, msg, whatsapp_account)
         return
     
-    # Build compact serializable list (only store task_id for selection)
-    # This reduces context size significantly
-    compact_list = []
+    # Store only the ordered task ids; titles and deadlines for later pages
+    # are re-read from Sprint Board, so context size stays small
+    task_ids = []
     for task in task_list:
-        compact_list.append({
-            "task_id": task["task_id"],
-            "task_title": task["task_title"][:35],  # Truncate to save space
-            "days_text": task["days_text"],
-            "status": task["status"]
-        })
-    
-    # Store all task list data in a single consolidated context
+        task_ids.append(task["task_id"])
+        _set_display_titles(task)
     context_data = {
-        "tasks": compact_list,
+        "task_ids": task_ids,
         "page": 0,
         "status_counts": status_counts,
         "exclude_status": exclude_status,
         "header": header_text
     }
-    set_context(to_number, "task_list_context", context_data)
     
-    # Send first page
-    _send_paginated_task_list(to_number, compact_list, whatsapp_account, header_text, status_counts, exclude_status, page=0)
+    # Send first page (rows already in memory, no re-fetch needed); this also stores the context
+    _send_paginated_task_list(to_number, task_ids, whatsapp_account, header_text, status_counts, exclude_status, page=0, tasks=task_list, context=context_data)
+
+
+def _set_display_titles(task):
+    """Store the truncated titles used in the message body and list buttons"""
+    title = task["task_title"] or "Unnamed Task"
+    task["title_body"] = title[:35]
+    task["title_btn"] = title[:20]
+    return task
+
+
+def _fetch_page_tasks(task_ids):
+    """Fetch display rows for a slice of task ids with one query
+    
+    Returns:
+        List aligned with task_ids; None for tasks that no longer exist
+    """
+    if not task_ids:
+        return []
+    
+    today_date = getdate()
+    rows = frappe.get_all(
+        "Sprint Board",
+        filters={"name": ["in", task_ids]},
+        fields=["name", "task_name", "deadline", "status"],
+        order_by=None,
+        limit_page_length=0
+    )
+    by_id = {
+        row.name: _set_display_titles({
+            "task_id": row.name,
+            "task_title": row.task_name,
+            "days_text": get_days_text(row.deadline, today_date),
+            "status": row.status
+        })
+        for row in rows
+    }
+    return [by_id.get(task_id) for task_id in task_ids]
 
 
 def _build_status_summary(status_counts, exclude_status=None):
@@ -439,18 +501,29 @@ def _build_status_summary(status_counts, exclude_status=None):
 
 
 
-def _send_paginated_task_list(to_number, task_list, whatsapp_account, header_text, status_counts, exclude_status=None, page=0):
+def _send_paginated_task_list(to_number, task_ids, whatsapp_account, header_text, status_counts, exclude_status=None, page=0, send_typing=None, tasks=None, context=None):
     """Internal function to send a page of tasks
     
     Args:
+        task_ids: Ordered list of all task ids in the list
         page: 0-indexed page number, each page shows 9 tasks + Load More button if needed
         status_counts: Dict with counts for not_started, in_progress, overdue, on_hold
         exclude_status: Status key to exclude from summary
+        send_typing: Whether to send a typing indicator first. Defaults to the first
+            page only; later pages are rendered from stored context and reply instantly.
+        tasks: Optional full task list aligned with task_ids; when omitted only the
+            rows shown on this page are fetched
+        context: task_list_context dict the caller already holds; it is updated
+            with the page and written once. Read from storage when omitted.
     """
 
-    send_typing_indicator(to_number, whatsapp_account)
+    if send_typing is None:
+        send_typing = page == 0
+    
+    if send_typing:
+        send_typing_indicator(to_number, whatsapp_account)
     
-    total_tasks = len(task_list)
+    total_tasks = len(task_ids)
     TASKS_PER_PAGE = 9  # Show 9 tasks + 1 Load More button = 10 total (WhatsApp limit)
     
     start_idx = page * TASKS_PER_PAGE
@@ -458,35 +531,57 @@ def _send_paginated_task_list(to_number, task_list, whatsapp_account, header_tex
     has_more = end_idx < total_tasks
     
     # Update page in consolidated context
-    context = get_context_data(to_number, "task_list_context") or {}
+    if context is None:
+        context = get_context_data(to_number, "task_list_context") or {}
     context["page"] = page
     set_context(to_number, "task_list_context", context)
     
     # Build task list text - limit to avoid exceeding WhatsApp's 1024 char body limit
     MAX_TASKS_IN_BODY = 12
-    task_list_text = ""
+    
+    # Only the rows shown on this page are needed: the body preview on page 0,
+    # plus the buttons for the current page
+    if page == 0:
+        window_start, window_end = 0, max(end_idx, min(MAX_TASKS_IN_BODY, total_tasks))
+    else:
+        window_start, window_end = start_idx, end_idx
+    
+    if tasks is not None:
+        window = tasks[window_start:window_end]
+    else:
+        window = _fetch_page_tasks(task_ids[window_start:window_end])
+    
+    def task_at(idx):
+        return window[idx - window_start]
+    
+    parts = []
     buttons = []
+    _emoji = STATUS_EMOJI.get
     
-    # Show all tasks in body (numbered from 1), but only current page in buttons
-    for idx, task in enumerate(task_list, 1):
-        status_emoji = get_status_emoji(task["status"])
-        
-        # Only include first MAX_TASKS_IN_BODY tasks in the body text
-        if idx <= MAX_TASKS_IN_BODY:
-            task_list_text += f"{idx}. {task['task_title'][:35]} ({task['days_text']}) {status_emoji}\n"
+    # Show first tasks in body (numbered from 1), but only current page in buttons
+    if page == 0:
+        for idx in range(min(MAX_TASKS_IN_BODY, total_tasks)):
+            task = task_at(idx)
+            if task:
+                status_emoji = _emoji(task["status"], "⚫")
+                parts.append(f"{idx + 1}. {task['title_body']} ({task['days_text']}) {status_emoji}\n")
     
     # Add indicator if there are more tasks not shown in body
     if total_tasks > MAX_TASKS_IN_BODY:
         remaining = total_tasks - MAX_TASKS_IN_BODY
-        task_list_text += f"... +{remaining} more task{'s' if remaining > 1 else ''}\n"
+        parts.append(f"... +{remaining} more task{'s' if remaining > 1 else ''}\n")
+    
+    task_list_text = "".join(parts)
     
     # Build buttons for current page only
     for idx in range(start_idx, end_idx):
-        task = task_list[idx]
+        task = task_at(idx)
+        if not task:
+            continue
         buttons.append({
             "id": f"SELECT_TASK:{task['task_id']}",
-            "title": task["task_title"][:20],
-            "description": f"{idx + 1}. {task['days_text'][:68]}"
+            "title": task["title_btn"],
+            "description": f"{idx + 1}. {task['days_text']}"  # days text is always well under the 72 char limit
         })
     
     # Add Load More button if there are more tasks
@@ -502,13 +597,16 @@ def _send_paginated_task_list(to_number, task_list, whatsapp_account, header_tex
     if page == 0:
         message_body = f"📋 *{header_text}* ({total_tasks} task{'s' if total_tasks > 1 else ''})\n\n{task_list_text}\n"
     else:
-        message_body = f"📋 *{header_text}* (Page {page + 1}, showing {start_idx + 1}-{end_idx} of {total_tasks})\n\n"
+        page_parts = [f"📋 *{header_text}* (Page {page + 1}, showing {start_idx + 1}-{end_idx} of {total_tasks})\n\n"]
         # Show current page tasks in body for page > 0
         for idx in range(start_idx, end_idx):
-            task = task_list[idx]
-            status_emoji = get_status_emoji(task["status"])
-            message_body += f"{idx + 1}. {task['task_title'][:35]} ({task['days_text']}) {status_emoji}\n"
-        message_body += "\n"
+            task = task_at(idx)
+            if not task:
+                continue
+            status_emoji = _emoji(task["status"], "⚫")
+            page_parts.append(f"{idx + 1}. {task['title_body']} ({task['days_text']}) {status_emoji}\n")
+        page_parts.append("\n")
+        message_body = "".join(page_parts)
     
     # Add instructions
     if total_tasks > TASKS_PER_PAGE:
@@ -532,32 +630,40 @@ def send_task_list(to_number, tasks, whatsapp_account, is_initial=False):
         send_reply(to_number, "✅ All tasks are completed! Great job! 🎉", whatsapp_account)
         return
     
-    buttons = []
-    task_list_text = ""
     total_tasks = len(tasks)
-
-    for idx, task in enumerate(tasks, 1):
-        task_id = task["task_name"]
-        task_title = task["task_title"] or "Unnamed Task"
-        days_overdue = task["days_overdue"]
-        status = task.get("status", "Not Started")
-
-        status_emoji = get_status_emoji(status)
-        overdue_text = "1 day" if days_overdue == 1 else f"{days_overdue} days"
-
-        # Only include first MAX_WHATSAPP_LIST_ITEMS tasks in body to stay within 1024-char limit
-        if idx <= MAX_WHATSAPP_LIST_ITEMS:
-            task_list_text += f"{idx}. {task_title[:35]} ({overdue_text} overdue) {status_emoji}\n"
-
-        buttons.append({
+    _emoji = STATUS_EMOJI.get
+    
+    # Only the first MAX_WHATSAPP_LIST_ITEMS tasks are shown in the body (1024-char limit)
+    # and as list buttons, so only those rows are formatted
+    rows = [
+        (
+            idx,
+            task["task_name"],
+            task["task_title"] or "Unnamed Task",
+            "1 day" if task["days_overdue"] == 1 else f"{task['days_overdue']} days",
+            _emoji(task.get("status", "Not Started"), "⚫")
+        )
+        for idx, task in enumerate(tasks[:MAX_WHATSAPP_LIST_ITEMS], 1)
+    ]
+    
+    parts = [
+        f"{idx}. {task_title[:35]} ({overdue_text} overdue) {status_emoji}\n"
+        for idx, _, task_title, overdue_text, status_emoji in rows
+    ]
+    buttons = [
+        {
             "id": f"SELECT_TASK:{task_id}",
             "title": task_title[:20],
             "description": f"Overdue by {overdue_text}"
-        })
-
+        }
+        for _, task_id, task_title, overdue_text, _ in rows
+    ]
+    
     if total_tasks > MAX_WHATSAPP_LIST_ITEMS:
         remaining = total_tasks - MAX_WHATSAPP_LIST_ITEMS
-        task_list_text += f"... +{remaining} more task{'s' if remaining > 1 else ''}\n"
+        parts.append(f"... +{remaining} more task{'s' if remaining > 1 else ''}\n")
+    
+    task_list_text = "".join(parts)
     
     if is_initial:
         header = f"🚨 *You have {total_tasks} overdue task{'s' if total_tasks > 1 else ''}*"
@@ -570,4 +676,4 @@ def send_task_list(to_number, tasks, whatsapp_account, is_initial=False):
         f"Select a task to update its status."
     )
     
-    send_interactive_message(to_number, message_body, buttons[:MAX_WHATSAPP_LIST_ITEMS], whatsapp_account)
+    send_interactive_message(to_number, message_body, buttons, whatsapp_account)
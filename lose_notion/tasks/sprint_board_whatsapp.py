@@ -5,12 +5,28 @@
 # All logic is implemented in the handlers/ modules.
 
 import frappe
-from frappe.utils import getdate, today, date_diff, now_datetime
+from frappe.utils import getdate, now_datetime
+from itertools import groupby
 import json
 
-from .whatsapp_utils import mark_as_read, send_reply, send_interactive_message
-from .user_utils import get_user_by_phone
-from .handlers.menu_handlers import handle_menu_trigger, handle_status_filter_trigger
+from .whatsapp_utils import (
+    mark_as_read,
+    send_reply,
+    send_interactive_message,
+    start_outbox,
+    flush_outbox,
+    discard_outbox
+)
+from .user_utils import get_user_by_phone, normalize_phone
+from .context_storage import get_context
+from .handlers.menu_handlers import (
+    MENU_TRIGGERS,
+    GUIDE_TRIGGER,
+    STATUS_FILTER_TRIGGERS,
+    SPECIAL_FILTER_TRIGGERS,
+    handle_menu_trigger,
+    handle_status_filter_trigger
+)
 from .handlers.task_handlers import (
     handle_task_selection,
     handle_status_update,
@@ -18,8 +34,7 @@ from .handlers.task_handlers import (
     handle_more_command,
     handle_load_more_button,
     send_task_list,
-    send_my_tasks,
-    get_status_emoji
+    send_my_tasks
 )
 from .handlers.creation_handlers import (
     handle_task_creation_trigger,
@@ -28,7 +43,8 @@ from .handlers.creation_handlers import (
     handle_menu_add_task,
     handle_guided_flow_input,
     handle_guided_assignee_button,
-    handle_guided_deadline_button
+    handle_guided_deadline_button,
+    MY_TASKS_TRIGGERS
 )
 from .handlers.confirmation_handlers import (
     handle_task_confirmation,
@@ -56,71 +72,83 @@ def send_overdue_task_alerts():
         frappe.log_error("WhatsApp account not configured in site_config.json", "Task Alert Error")
         return
     
-    today_date = getdate(today())
+    today_date = getdate()
     
-    # Get all incomplete, overdue tasks from Sprint Board (excluding On Hold)
-    overdue_tasks = frappe.get_all(
-        "Sprint Board",
-        filters={
-            "status": ["not in", ["Completed", "On Hold"]],
-            "deadline": ["<", today_date],
-            "assigned_to": ["is", "set"]
-        },
-        fields=["name", "task_name", "deadline", "status", "assigned_to", "last_alerted"]
-    )
+    overdue_tasks = _get_overdue_tasks(today_date)
     
     if not overdue_tasks:
         return
     
-    # Group by user
-    user_tasks = {}
+    # Names of tasks alerted in this run, stamped with one bulk UPDATE at the end
+    alerted_names = []
     
-    for task in overdue_tasks:
-        # Skip if already alerted today
-        if task.last_alerted and getdate(task.last_alerted) == today_date:
-            continue
-        
-        if task.assigned_to not in user_tasks:
-            user_tasks[task.assigned_to] = []
-        
-        days_overdue = date_diff(today_date, getdate(task.deadline))
-        user_tasks[task.assigned_to].append({
-            "task_name": task.name,
-            "task_title": task.task_name,
-            "days_overdue": days_overdue,
-            "status": task.status
-        })
-    
-    for user, tasks in user_tasks.items():
-        if not tasks:
-            continue
-            
-        try:
-            mobile_no = frappe.db.get_value("User", user, "mobile_no")
-        except Exception as e:
-            frappe.log_error(f"Error getting phone for {user}: {str(e)}", "Task Alert Error")
-            continue
-        
+    # Rows arrive sorted by assignee with the assignee's mobile number joined in,
+    # so each user's tasks are one contiguous group processed as it streams by
+    for user, rows in groupby(overdue_tasks, key=lambda t: t.assigned_to):
+        rows = list(rows)
+        mobile_no = rows[0].mobile_no
         if not mobile_no:
             frappe.log_error(f"No phone number for user '{user}'", "Task Alert Error")
             continue
         
-        mobile_no = str(mobile_no).replace(" ", "").replace("-", "").replace("+", "")
+        mobile_no = normalize_phone(mobile_no)
+        tasks = [
+            {
+                "task_name": task.name,
+                "task_title": task.task_name,
+                "days_overdue": task.days_overdue,
+                "status": task.status
+            }
+            for task in rows
+        ]
         
         try:
             send_task_list(mobile_no, tasks, WHATSAPP_ACCOUNT, is_initial=True)
-            
-            # Update last_alerted for all tasks
-            for task in tasks:
-                frappe.db.set_value("Sprint Board", task["task_name"], "last_alerted", now_datetime())
-            
-            frappe.db.commit()
+            alerted_names.extend(task["task_name"] for task in tasks)
             
         except Exception as e:
             frappe.log_error(
                 f"Failed to send grouped alert to '{user}': {str(e)}",
                 "Task Alert Error"
             )
+    
+    # Update last_alerted for all alerted tasks in a single round-trip
+    if alerted_names:
+        timestamp = now_datetime()
+        frappe.db.sql(
+            """
+            UPDATE `tabSprint Board`
+            SET last_alerted = %(ts)s, modified = %(ts)s
+            WHERE name IN %(names)s
+            """,
+            {"ts": timestamp, "names": tuple(alerted_names)}
+        )
+    
+    frappe.db.commit()
+
+
+def _get_overdue_tasks(today_date):
+    """Get incomplete, overdue tasks not yet alerted today (excluding On Hold)
+    
+    Filtering, days-overdue computation, the assignee's mobile number and
+    grouping order all come from one SQL query.
+    """
+    return frappe.db.sql(
+        """
+        SELECT sb.assigned_to, sb.name, sb.task_name, sb.status,
+            DATEDIFF(%(today)s, sb.deadline) AS days_overdue,
+            u.mobile_no
+        FROM `tabSprint Board` sb
+        LEFT JOIN `tabUser` u ON u.name = sb.assigned_to
+        WHERE sb.status NOT IN ('Completed', 'On Hold')
+            AND sb.deadline < %(today)s
+            AND IFNULL(sb.assigned_to, '') != ''
+            AND (sb.last_alerted IS NULL OR DATE(sb.last_alerted) != %(today)s)
+        ORDER BY sb.assigned_to, sb.deadline
+        """,
+        {"today": today_date},
+        as_dict=True
+    )
 
 
 # ============================================
@@ -132,153 +160,156 @@ def handle_whatsapp_task_response(doc, method=None):
     
     This is the entry point called by hooks.py on WhatsApp Message after_insert.
     Routes messages to appropriate handlers based on content and type.
+    
+    Handlers do not commit; everything written while handling one message
+    (status updates, context) is committed once here. Replies are buffered
+    and sent in order by one background job after that commit, or dropped
+    if the dispatch fails and its writes are rolled back.
     """
     
     if doc.type != "Incoming":
         return
     
+    # Read every field used below once
     message = doc.message or ""
     from_number = doc.get("from")
     whatsapp_account = doc.whatsapp_account
-    
-    # Mark message as read (blue ticks)
+    content_type = doc.content_type
     message_id = doc.get("message_id") or doc.get("id")
-    mark_as_read(message_id, whatsapp_account)
     
-    # Handle text messages
-    if doc.content_type == "text":
-        _handle_text_message(message, from_number, whatsapp_account)
+    # Mark message as read (blue ticks)
+    mark_as_read(message_id, whatsapp_account, from_number)
+    
+    # Text messages and button/list replies are the only routed types
+    if content_type == "text":
+        dispatch = _handle_text_message
+    elif content_type == "button":
+        dispatch = _handle_button_message
+    else:
         return
     
-    # Handle button/list replies
-    if doc.content_type == "button":
-        _handle_button_message(message, from_number, whatsapp_account)
-        return
+    # Roll back only this dispatch on failure, never the incoming message itself
+    frappe.db.savepoint("task_bot_dispatch")
+    start_outbox()
+    try:
+        dispatch(message, from_number, whatsapp_account)
+    except Exception:
+        # Replies buffered so far describe writes that are being rolled back
+        discard_outbox()
+        frappe.db.rollback(save_point="task_bot_dispatch")
+        frappe.log_error(frappe.get_traceback(), "Task Bot Error")
+    else:
+        flush_outbox()
+    finally:
+        frappe.db.commit()
+
+
+# Exact keywords handled before any chat context is consulted
+_KEYWORD_HANDLERS = {
+    **dict.fromkeys(MENU_TRIGGERS, handle_menu_trigger),
+    **dict.fromkeys(
+        [GUIDE_TRIGGER, *STATUS_FILTER_TRIGGERS, *SPECIAL_FILTER_TRIGGERS],
+        handle_status_filter_trigger
+    )
+}
+
+# Handlers that only apply while the sender has a given context type, in priority order
+_CONTEXT_HANDLERS = {
+    "deadline_edit": (handle_deadline_number_selection, handle_deadline_input),
+    "deadline_edit_task": (handle_deadline_input,),
+    "task_list_context": (handle_more_command, handle_number_selection),
+    "guided_flow": (handle_pending_task_input,),
+    "task_creation_mode": (handle_pending_task_input,)
+}
 
 
 def _handle_text_message(message, from_number, whatsapp_account):
     """Route text messages to appropriate handlers"""
     
-    # Check for menu trigger first
-    if handle_menu_trigger(message, from_number, whatsapp_account):
-        return
+    normalized = message.strip().lower()
     
-    # Check for status filter triggers (not started, in progress, on hold)
-    if handle_status_filter_trigger(message, from_number, whatsapp_account):
+    # Menu, guide and status filter keywords
+    keyword_handler = _KEYWORD_HANDLERS.get(normalized)
+    if keyword_handler and keyword_handler(message, from_number, whatsapp_account):
         return
     
-    # Check for deadline edit number selection
-    if handle_deadline_number_selection(message, from_number, whatsapp_account):
-        return
-    
-    # Check for deadline input (when editing)
-    if handle_deadline_input(message, from_number, whatsapp_account):
-        return
-    
-    # Check for "more" command to load more tasks
-    if handle_more_command(message, from_number, whatsapp_account):
-        return
-    
-    # Check for number selection (for large lists > 10 items)
-    if handle_number_selection(message, from_number, whatsapp_account):
-        return
-    
-    # Check for pending task creation mode (from menu button or guided flow)
-    if handle_pending_task_input(message, from_number, whatsapp_account):
-        return
+    # Stateful input (deadline edits, list paging/selection, task creation);
+    # the context is read once and shared with the handlers for this request
+    context = get_context(from_number)
+    if context:
+        for handler in _CONTEXT_HANDLERS.get(context["context_type"], ()):
+            if handler(message, from_number, whatsapp_account):
+                return
     
     # Check for "my tasks" trigger
-    if handle_my_tasks_trigger(message, from_number, whatsapp_account):
+    if normalized in MY_TASKS_TRIGGERS:
+        handle_my_tasks_trigger(message, from_number, whatsapp_account)
         return
     
     # Check for task creation triggers
-    if handle_task_creation_trigger(message, from_number, whatsapp_account):
-        return
+    handle_task_creation_trigger(message, from_number, whatsapp_account, message_lower=normalized)
 
 
-def _handle_button_message(message, from_number, whatsapp_account):
-    """Route button responses to appropriate handlers"""
-    
+def _handle_menu_my_tasks(from_number, whatsapp_account):
+    """Show the sender's tasks from the My Tasks menu button"""
+    current_user = get_user_by_phone(from_number)
+    if current_user:
+        send_my_tasks(from_number, current_user["name"], whatsapp_account)
+    else:
+        send_reply(from_number, "❌ Your phone number is not linked to any user account.", whatsapp_account)
+
+
+def _handle_status_button(arg, from_number, whatsapp_account):
+    """Handle STATUS:<status>:<task_id> buttons"""
+    status, sep, task_id = arg.partition(":")
+    if sep:
+        handle_status_update(task_id, status, from_number, whatsapp_account)
+
+
+# Buttons whose id is the whole message
+_BUTTON_HANDLERS = {
     # Menu button responses
-    if message == "MENU_ADD_TASK":
-        handle_menu_add_task(from_number, whatsapp_account)
-        return
-    
-    if message == "MENU_MY_TASKS":
-        current_user = get_user_by_phone(from_number)
-        if current_user:
-            send_my_tasks(from_number, current_user["name"], whatsapp_account)
-        else:
-            send_reply(from_number, "❌ Your phone number is not linked to any user account.", whatsapp_account)
-        return
-    
-    # Task status update flow
-    if message.startswith("SELECT_TASK:"):
-        task_id = message.replace("SELECT_TASK:", "").strip()
-        handle_task_selection(task_id, from_number, whatsapp_account)
-        return
-    
+    "MENU_ADD_TASK": handle_menu_add_task,
+    "MENU_MY_TASKS": _handle_menu_my_tasks,
     # Load More button for task pagination
-    if message == "LOAD_MORE_TASKS":
-        handle_load_more_button(from_number, whatsapp_account)
-        return
-    
-    if message.startswith("STATUS:"):
-        parts = message.replace("STATUS:", "").split(":", 1)
-        if len(parts) == 2:
-            status = parts[0]
-            task_id = parts[1]
-            handle_status_update(task_id, status, from_number, whatsapp_account)
-        return
-    
+    "LOAD_MORE_TASKS": handle_load_more_button,
     # Task creation confirmation flow
-    if message == "CONFIRM_TASKS":
-        handle_task_confirmation("CONFIRM_TASKS", from_number, whatsapp_account)
-        return
-    
-    if message == "CANCEL_TASKS":
-        handle_task_confirmation("CANCEL_TASKS", from_number, whatsapp_account)
-        return
-    
+    "CONFIRM_TASKS": lambda f, w: handle_task_confirmation("CONFIRM_TASKS", f, w),
+    "CANCEL_TASKS": lambda f, w: handle_task_confirmation("CANCEL_TASKS", f, w),
     # Change deadline button
-    if message == "CHANGE_DEADLINE":
-        handle_change_deadline(from_number, whatsapp_account)
-        return
-    
+    "CHANGE_DEADLINE": handle_change_deadline,
     # Deadline quick buttons
-    if message == "DEADLINE_TODAY":
-        handle_deadline_button("TODAY", from_number, whatsapp_account)
-        return
-    
-    if message == "DEADLINE_TOMORROW":
-        handle_deadline_button("TOMORROW", from_number, whatsapp_account)
-        return
-    
+    "DEADLINE_TODAY": lambda f, w: handle_deadline_button("TODAY", f, w),
+    "DEADLINE_TOMORROW": lambda f, w: handle_deadline_button("TOMORROW", f, w),
     # Add another task button
-    if message == "ADD_ANOTHER_TASK":
-        handle_add_another_task(from_number, whatsapp_account)
-        return
-    
+    "ADD_ANOTHER_TASK": handle_add_another_task,
     # Guided flow buttons
-    if message == "GUIDED_TODAY":
-        handle_guided_deadline_button("TODAY", from_number, whatsapp_account)
-        return
-    
-    if message == "GUIDED_TOMORROW":
-        handle_guided_deadline_button("TOMORROW", from_number, whatsapp_account)
-        return
-    
-    if message == "GUIDED_ASSIGN_ME":
-        handle_guided_assignee_button("ME", from_number, whatsapp_account)
-        return
+    "GUIDED_TODAY": lambda f, w: handle_guided_deadline_button("TODAY", f, w),
+    "GUIDED_TOMORROW": lambda f, w: handle_guided_deadline_button("TOMORROW", f, w),
+    "GUIDED_ASSIGN_ME": lambda f, w: handle_guided_assignee_button("ME", f, w)
+}
+
+# Buttons of the form PREFIX:<argument>, keyed by PREFIX
+_BUTTON_PREFIX_HANDLERS = {
+    # Task status update flow
+    "SELECT_TASK": handle_task_selection,
+    "STATUS": _handle_status_button,
+    # Guided flow assignee pick
+    "GUIDED_ASSIGNEE": handle_guided_assignee_button,
+    # User selection for ambiguous assignee
+    "ASSIGN_USER": handle_user_selection
+}
+
+
+def _handle_button_message(message, from_number, whatsapp_account):
+    """Route button responses to appropriate handlers"""
     
-    if message.startswith("GUIDED_ASSIGNEE:"):
-        user_name = message.replace("GUIDED_ASSIGNEE:", "").strip()
-        handle_guided_assignee_button(user_name, from_number, whatsapp_account)
+    handler = _BUTTON_HANDLERS.get(message)
+    if handler:
+        handler(from_number, whatsapp_account)
         return
     
-    # User selection for ambiguous assignee
-    if message.startswith("ASSIGN_USER:"):
-        user_name = message.replace("ASSIGN_USER:", "").strip()
-        handle_user_selection(user_name, from_number, whatsapp_account)
-        return
+    prefix, sep, arg = message.partition(":")
+    handler = _BUTTON_PREFIX_HANDLERS.get(prefix) if sep else None
+    if handler:
+        handler(arg.strip(), from_number, whatsapp_account)
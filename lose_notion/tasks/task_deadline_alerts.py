@@ -209,59 +209,6 @@
 # # PART 2: HANDLE WHATSAPP RESPONSES (STATUS UPDATE)
 # # ============================================
 
-# def handle_whatsapp_task_response(doc, method=None):
-#     """Main hook to process incoming WhatsApp messages"""
-    
-#     if doc.type != "Incoming":
-#         return
-    
-#     message = doc.message or ""
-#     from_number = doc.get("from")
-#     whatsapp_account = doc.whatsapp_account
-    
-#     # Check for text message triggers
-#     if doc.content_type == "text":
-#         # Check for "my tasks" trigger first
-#         if handle_my_tasks_trigger(message, from_number, whatsapp_account):
-#             return
-#         # Check for task creation triggers
-#         if handle_task_creation_trigger(message, from_number, whatsapp_account):
-#             return
-    
-#     # Handle button/list replies
-#     if doc.content_type != "button":
-#         return
-    
-#     # Task status update flow
-#     if message.startswith("SELECT_TASK:"):
-#         task_row_name = message.replace("SELECT_TASK:", "").strip()
-#         handle_task_selection(task_row_name, from_number, whatsapp_account)
-#         return
-    
-#     if message.startswith("STATUS:"):
-#         parts = message.replace("STATUS:", "").split(":", 1)
-#         if len(parts) == 2:
-#             status = parts[0]
-#             task_row_name = parts[1]
-#             handle_status_update(task_row_name, status, from_number, whatsapp_account)
-#         return
-    
-#     # Task creation confirmation flow
-#     if message == "CONFIRM_TASKS":
-#         handle_task_confirmation("CONFIRM_TASKS", from_number, whatsapp_account)
-#         return
-    
-#     if message == "CANCEL_TASKS":
-#         handle_task_confirmation("CANCEL_TASKS", from_number, whatsapp_account)
-#         return
-    
-#     # User selection for ambiguous assignee
-#     if message.startswith("ASSIGN_USER:"):
-#         user_name = message.replace("ASSIGN_USER:", "").strip()
-#         handle_user_selection(user_name, from_number, whatsapp_account)
-#         return
-
-
 # def handle_task_selection(task_row_name, from_number, whatsapp_account):
 #     """When user selects a task, show status options (excluding current status)"""
     
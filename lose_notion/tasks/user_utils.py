@@ -2,29 +2,84 @@
 # Handles user lookup and fuzzy search
 
 import frappe
+import heapq
+from operator import itemgetter
+from rapidfuzz.distance.JaroWinkler import normalized_similarity as _jaro_winkler
+
+from .cache_utils import get_cached_value
+
+# Minimum Jaro-Winkler similarity for a typo match
+TYPO_MATCH_THRESHOLD = 0.85
+
+# Redis hash of phone key -> user dict ({} for no match), cleared on any User change
+USER_BY_PHONE_CACHE_KEY = "task_bot_user_by_phone"
+# The hash as a whole also expires (Redis has no per-field TTL), for the same reason
+# as USER_CORPUS_TTL: a user disabled by raw SQL must not keep bot access
+USER_BY_PHONE_TTL = 3600  # seconds
+# Enabled users prepared for fuzzy_search_user, cleared on any User change
+USER_CORPUS_CACHE_KEY = "task_bot_user_corpus"
+# Also expires, so User rows changed without a doc event (raw SQL, imports) are picked up
+USER_CORPUS_TTL = 3600  # seconds
+
+# Characters stripped from phone numbers before sending (spaces, dashes, plus)
+_PHONE_TABLE = str.maketrans("", "", " -+")
+
+
+def normalize_phone(phone_number):
+    """Strip spaces, dashes and '+' from a phone number in a single pass"""
+    return str(phone_number).translate(_PHONE_TABLE)
+
+
+def get_phone_key(phone_number):
+    """Get the last 10 digits of a phone number, ignoring formatting and country code"""
+    return "".join(c for c in str(phone_number) if c.isdigit())[-10:]
 
 
 def get_user_by_phone(phone_number):
     """Get user by mobile number
     
+    Matches on the indexed User.mobile_no_last10 column; results (including
+    misses, stored as an empty dict since hget treats None as a miss) are
+    cached in Redis until a User is saved or deleted, or the hash expires.
+    
     Args:
         phone_number: Phone number (with or without country code)
         
     Returns:
         Dict with name, full_name, email or None if not found
     """
-    phone = str(phone_number).replace(" ", "").replace("-", "").replace("+", "")
-    
-    user = frappe.db.get_value(
-        "User",
-        {"mobile_no": ("like", f"%{phone[-10:]}%"), "enabled": 1},
-        ["name", "full_name", "email"],
-        as_dict=True
-    )
-    return user
+    phone_key = get_phone_key(phone_number)
+    if not phone_key:
+        return None
+    
+    cache = frappe.cache()
+    user = cache.hget(USER_BY_PHONE_CACHE_KEY, phone_key)
+    if user is None:
+        user = frappe.db.get_value(
+            "User",
+            {"mobile_no_last10": phone_key, "enabled": 1},
+            ["name", "full_name", "email"],
+            as_dict=True
+        ) or {}
+        cache.hset(USER_BY_PHONE_CACHE_KEY, phone_key, user)
+        # Start the expiry when the hash is created; later fields must not extend it
+        key = cache.make_key(USER_BY_PHONE_CACHE_KEY)
+        if cache.ttl(key) < 0:
+            cache.expire(key, USER_BY_PHONE_TTL)
+    return user or None
+
+
+def set_mobile_no_last10(doc, method=None):
+    """Keep User.mobile_no_last10 in sync with mobile_no (User before_save hook)"""
+    doc.mobile_no_last10 = get_phone_key(doc.mobile_no) if doc.mobile_no else None
+
 
+def clear_user_caches(doc=None, method=None):
+    """Drop cached phone lookups and the search corpus (User on_update/on_trash hook)"""
+    frappe.cache().delete_value([USER_BY_PHONE_CACHE_KEY, USER_CORPUS_CACHE_KEY])
 
-def fuzzy_search_user(search_term, limit=3):
+
+def fuzzy_search_user(search_term, limit=3, corpus=None):
     """Search for users matching the search term with improved fuzzy matching
     
     Improvements over basic character overlap:
@@ -33,9 +88,21 @@ def fuzzy_search_user(search_term, limit=3):
     - Email prefix matching (before @)
     - Higher scores for prefix matches
     
+    Matches against the cached user corpus (see _get_user_corpus). An exact
+    match on full name or email (any enabled user) is returned on its own
+    without scoring anyone. Otherwise system users are scored:
+    - 50: Search term is prefix of first or last name
+    - 40: Search term in full name
+    - 45 / 30: Search term is prefix of / in email prefix
+    - +5: Bonus for shorter names that match (more specific)
+    - 17-20: No substring match, but a name part or the email prefix is a
+      close Jaro-Winkler match (catches typos)
+    Bigram overlap (0-1) is added to every score to order ties.
+    
     Args:
         search_term: Text to search for (name or email)
         limit: Maximum number of results
+        corpus: Preloaded user corpus (see fuzzy_search_users)
         
     Returns:
         List of user dicts with name, full_name, email
@@ -44,94 +111,138 @@ def fuzzy_search_user(search_term, limit=3):
         return []
     
     search_term = search_term.strip().lower()
-    
-    # Try exact email match first
-    exact_match = frappe.db.get_value(
-        "User",
-        {"enabled": 1, "email": search_term},
-        ["name", "full_name", "email"],
-        as_dict=True
-    )
-    if exact_match:
-        return [exact_match]
-    
-    # Try exact full name match (case insensitive)
-    exact_name = frappe.db.get_value(
-        "User",
-        {"enabled": 1, "full_name": ("like", search_term)},
-        ["name", "full_name", "email"],
-        as_dict=True
-    )
-    if exact_name:
-        return [exact_name]
-    
-    # Get all system users for fuzzy matching
-    users = frappe.get_all(
-        "User",
-        filters={"enabled": 1, "user_type": "System User"},
-        fields=["name", "full_name", "email"],
-        limit=100
-    )
+    word_start = " " + search_term
+    term_bigrams = _bigrams(search_term)
+    term_bigram_count = max(len(term_bigrams), 1)
+    if corpus is None:
+        corpus = _get_user_corpus()
+    
+    # Exact name/email hits are a dict lookup; skip the scoring loop entirely
+    exact_matches = corpus["exact_index"].get(search_term)
+    if exact_matches:
+        return [
+            frappe._dict(name=name, full_name=full_name, email=email)
+            for name, full_name, email in exact_matches[:limit]
+        ]
     
     scored_users = []
-    for user in users:
-        score = _calculate_match_score(search_term, user)
-        if score > 0:
-            scored_users.append((score, user))
-    
-    # Sort by score descending
-    scored_users.sort(key=lambda x: x[0], reverse=True)
-    return [u[1] for u in scored_users[:limit]]
+    for idx, (full_name, padded_name, email_prefix, user_bigrams, match_parts) in enumerate(zip(
+        corpus["full_names_lower"], corpus["padded_names_lower"],
+        corpus["email_prefixes"], corpus["bigrams"], corpus["match_parts"]
+    )):
+        in_name = search_term in full_name
+        in_email_prefix = search_term in email_prefix
+        if not (in_name or in_email_prefix):
+            # Fuzzy fallback: only clearly similar names qualify
+            similarity = max(_jaro_winkler(search_term, part) for part in match_parts)
+            if similarity >= TYPO_MATCH_THRESHOLD:
+                scored_users.append((20 * similarity, idx))
+            continue
+        
+        score = len(term_bigrams & user_bigrams) / term_bigram_count
+        # Prefix of any name part (padded name has a leading space)
+        if word_start in padded_name:
+            score += 50
+        if in_name:
+            score += 40
+        if email_prefix.startswith(search_term):
+            score += 45
+        elif in_email_prefix:
+            score += 30
+        if len(full_name) < 20:
+            score += 5
+        scored_users.append((score, idx))
+    
+    # Top matches by score, without sorting the whole candidate list
+    return [
+        _corpus_user(corpus, idx)
+        for _, idx in heapq.nlargest(limit, scored_users, key=itemgetter(0))
+    ]
 
 
-def _calculate_match_score(search_term, user):
-    """Calculate match score for a user against search term
-    
-    Scoring:
-    - 100: Exact match on full name or email
-    - 50: Search term is prefix of first or last name
-    - 40: Search term in full name or email prefix
-    - 20: Partial word match
-    - 0: No match
-    """
-    full_name = (user.full_name or "").lower()
-    email = (user.email or "").lower()
-    email_prefix = email.split('@')[0] if '@' in email else email
-    
-    score = 0
+def fuzzy_search_users(search_terms, limit=3):
+    """Run fuzzy_search_user for several search terms at once
     
-    # Exact match
-    if search_term == full_name or search_term == email:
-        return 100
+    The corpus is loaded once and each distinct (normalized) term is scored
+    once, e.g. when a batch of task lines mentions the same assignee.
     
-    # Split name into parts (first name, last name, etc.)
-    name_parts = full_name.split()
-    
-    # Check if search_term is a prefix of any name part (high score)
-    for part in name_parts:
-        if part.startswith(search_term):
-            score += 50
-            break
-    
-    # Check if search_term is in full name
-    if search_term in full_name:
-        score += 40
-    
-    # Check if search_term is prefix of email (before @)
-    if email_prefix.startswith(search_term):
-        score += 45
-    elif search_term in email_prefix:
-        score += 30
+    Returns:
+        Dict of search term -> list of user dicts
+    """
+    corpus = _get_user_corpus()
+    results = {}
+    by_normalized = {}
+    for search_term in search_terms:
+        normalized = (search_term or "").strip().lower()
+        if normalized not in by_normalized:
+            by_normalized[normalized] = fuzzy_search_user(search_term, limit, corpus=corpus)
+        results[search_term] = by_normalized[normalized]
+    return results
+
+
+def _corpus_user(corpus, idx):
+    """Build the user dict returned by fuzzy_search_user for a corpus position"""
+    return frappe._dict(name=corpus["names"][idx], full_name=corpus["full_names"][idx], email=corpus["emails"][idx])
+
+
+def _bigrams(text):
+    """Get the set of adjacent character pairs in text"""
+    return frozenset(text[i:i + 2] for i in range(len(text) - 1))
+
+
+def _get_user_corpus():
+    """Get system users as parallel lists with pre-lowered match strings, plus
+    an exact name/email index of all enabled users
     
-    # Check partial word match in name parts
-    if score == 0:
-        for part in name_parts:
-            if search_term in part:
-                score += 20
-                break
+    Built once and kept in Redis until a User is saved or deleted (or the TTL
+    runs out), so searches neither query the User table nor lower-case names
+    per candidate.
+    """
+    return get_cached_value(USER_CORPUS_CACHE_KEY, _build_user_corpus, USER_CORPUS_TTL)
+
+
+def _build_user_corpus():
+    """Load enabled users into the corpus layout used by fuzzy_search_user
     
-    # Bonus for shorter names that match (more specific)
-    if score > 0 and len(full_name) < 20:
-        score += 5
+    The exact index covers every enabled user, like the exact email/name
+    lookups it replaces; only system users go into the scored lists.
+    """
+    users = frappe.get_all(
+        "User",
+        filters={"enabled": 1},
+        fields=["name", "full_name", "email", "user_type"],
+        order_by=None,
+        limit_page_length=0
+    )
     
-    return score
+    corpus = {
+        "names": [],
+        "full_names": [],
+        "emails": [],
+        "full_names_lower": [],
+        "padded_names_lower": [],
+        "email_prefixes": [],
+        "bigrams": [],
+        "match_parts": [],
+        # Lowered full name / email -> (name, full_name, email), for exact matches
+        "exact_index": {}
+    }
+    for user in users:
+        full_name = (user.full_name or "").lower()
+        email = (user.email or "").lower()
+        for key in {full_name, email} - {""}:
+            corpus["exact_index"].setdefault(key, []).append((user.name, user.full_name, user.email))
+        if user.user_type != "System User":
+            continue
+        
+        corpus["names"].append(user.name)
+        corpus["full_names"].append(user.full_name)
+        corpus["emails"].append(user.email)
+        corpus["full_names_lower"].append(full_name)
+        corpus["padded_names_lower"].append(" " + " ".join(full_name.split()))
+        email_prefix = email.split("@")[0]
+        corpus["email_prefixes"].append(email_prefix)
+        corpus["bigrams"].append(_bigrams(full_name) | _bigrams(email_prefix))
+        # Name parts and email prefix, compared one by one for typo matches
+        corpus["match_parts"].append((*full_name.split(), email_prefix))
+    return corpus
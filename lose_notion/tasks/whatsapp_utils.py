@@ -4,45 +4,163 @@
 import frappe
 import requests
 import json
+import pickle
+import time
+from functools import lru_cache
+from requests.adapters import HTTPAdapter
+
+# Shared HTTP session so repeated Graph API calls reuse the keep-alive connection
+# instead of paying a TCP + TLS handshake per request
+_session = requests.Session()
+# Graph API is the only host; keep enough pooled connections for threaded workers
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# Redis hash of "<whatsapp_account>|<sender>" -> latest unacknowledged message id
+READ_ACK_CACHE_KEY = "task_bot_pending_read_acks"
+# Set while a flush_read_acks job is queued; cleared by the job before it reads the hash
+READ_ACK_QUEUED_KEY = "task_bot_read_ack_flush_queued"
+READ_ACK_QUEUED_TTL = 300  # seconds, so a job that never runs does not block later flushes
+
+# Redis list of buffered send failures, written to Error Log by flush_send_errors()
+SEND_ERRORS_CACHE_KEY = "task_bot_send_errors"
+SEND_ERRORS_MAX = 256
+
+
+def _log_send_error(message, title):
+    """Buffer a send failure instead of inserting an Error Log row right away
+    
+    A Cloud API outage fails every outgoing message; buffering keeps that from
+    turning into one Error Log write per message. Only the latest
+    SEND_ERRORS_MAX entries are kept.
+    """
+    cache = frappe.cache()
+    cache.rpush(SEND_ERRORS_CACHE_KEY, json.dumps([title, message]))
+    cache.ltrim(SEND_ERRORS_CACHE_KEY, -SEND_ERRORS_MAX, -1)
+
+
+def flush_send_errors():
+    """Write buffered send failures to Error Log, one entry per distinct error (scheduled)"""
+    cache = frappe.cache()
+    entries = cache.lrange(SEND_ERRORS_CACHE_KEY, 0, -1)
+    if not entries:
+        return
+    # Drop only what was read; failures buffered meanwhile stay for the next run
+    cache.ltrim(SEND_ERRORS_CACHE_KEY, len(entries), -1)
+    
+    counts = {}
+    for entry in entries:
+        title, message = json.loads(entry)
+        counts[(title, message)] = counts.get((title, message), 0) + 1
+    
+    for (title, message), count in counts.items():
+        if count > 1:
+            message = f"{message} (x{count})"
+        frappe.log_error(message, title)
+
+
+# Cached credentials are re-read at least this often (seconds)
+CREDENTIALS_TTL = 300
 
 
 def get_whatsapp_api_credentials(whatsapp_account):
-    """Get WhatsApp API credentials from account doctype"""
+    """Get WhatsApp API credentials, cached per worker for up to CREDENTIALS_TTL
+    
+    The time bucket in the cache key rotates every CREDENTIALS_TTL seconds, so
+    a changed token is picked up without explicit invalidation. Failed lookups
+    raise inside the cache and so are retried on the next call.
+    """
     try:
-        account = frappe.get_doc("WhatsApp Account", whatsapp_account)
-        return {
-            "access_token": account.get_password("token") if hasattr(account, 'token') else account.token,
-            "phone_number_id": account.phone_id,
-            "api_url": f"https://graph.facebook.com/v18.0/{account.phone_id}/messages"
-        }
+        return _get_credentials_cached(
+            frappe.local.site, whatsapp_account, int(time.time()) // CREDENTIALS_TTL
+        )
     except Exception:
         return None
 
 
-def mark_as_read(message_id, whatsapp_account):
-    """Mark incoming message as read (blue ticks) via WhatsApp Cloud API"""
+@lru_cache(maxsize=16)
+def _get_credentials_cached(site, whatsapp_account, time_bucket):
+    """Get WhatsApp API credentials from account doctype (see get_whatsapp_api_credentials)"""
+    # Cached doc: the account rarely changes and frappe clears it on save
+    account = frappe.get_cached_doc("WhatsApp Account", whatsapp_account)
+    return {
+        "access_token": account.get_password("token") if hasattr(account, 'token') else account.token,
+        "phone_number_id": account.phone_id,
+        "api_url": f"https://graph.facebook.com/v18.0/{account.phone_id}/messages"
+    }
+
+
+def mark_as_read(message_id, whatsapp_account, from_number=None):
+    """Mark incoming message as read (blue ticks) via WhatsApp Cloud API
+    
+    The receipt is queued instead of sent inline. Marking a message read also
+    marks everything before it in the conversation, so only the latest id per
+    sender is kept and one job sends the pending receipts.
+    
+    A job is enqueued only when none is waiting. The job clears the queued
+    flag before it takes the hash, so a receipt stored after that point
+    always enqueues a new job instead of waiting for the next message.
+    """
     if not message_id:
         return
     
+    # Runs inside the WhatsApp Message after_insert hook; a Redis or queue error
+    # must not abort the insert of the incoming message
     try:
-        creds = get_whatsapp_api_credentials(whatsapp_account)
-        if not creds:
-            return
-        
-        headers = {
-            "Authorization": f"Bearer {creds['access_token']}",
-            "Content-Type": "application/json"
-        }
+        cache = frappe.cache()
+        cache.hset(READ_ACK_CACHE_KEY, f"{whatsapp_account}|{from_number or message_id}", message_id)
+        if cache.set(cache.make_key(READ_ACK_QUEUED_KEY), 1, nx=True, ex=READ_ACK_QUEUED_TTL):
+            frappe.enqueue("lose_notion.tasks.whatsapp_utils.flush_read_acks", queue="short")
+    except Exception as e:
+        _log_send_error(f"Failed to queue read receipt: {str(e)}", "WhatsApp API Error")
+
+
+def flush_read_acks():
+    """Send queued read receipts, one Cloud API call per conversation (background job)"""
+    cache = frappe.cache()
+    cache.delete(cache.make_key(READ_ACK_QUEUED_KEY))
+    pending = _take_read_acks()
+    creds_by_account = {}
+    
+    for field, message_id in pending.items():
+        whatsapp_account = field.split("|", 1)[0]
         
-        payload = {
-            "messaging_product": "whatsapp",
-            "status": "read",
-            "message_id": message_id
-        }
+        if whatsapp_account not in creds_by_account:
+            creds_by_account[whatsapp_account] = get_whatsapp_api_credentials(whatsapp_account)
+        creds = creds_by_account[whatsapp_account]
+        if not creds:
+            continue
         
-        requests.post(creds['api_url'], headers=headers, json=payload, timeout=5)
-    except Exception as e:
-        frappe.log_error(f"Failed to mark as read: {str(e)}", "WhatsApp API Error")
+        try:
+            headers = {
+                "Authorization": f"Bearer {creds['access_token']}",
+                "Content-Type": "application/json"
+            }
+            
+            payload = {
+                "messaging_product": "whatsapp",
+                "status": "read",
+                "message_id": message_id
+            }
+            
+            _session.post(creds['api_url'], headers=headers, json=payload, timeout=5)
+        except Exception as e:
+            _log_send_error(f"Failed to mark as read: {str(e)}", "WhatsApp API Error")
+
+
+def _take_read_acks():
+    """Read and delete the queued receipts in one MULTI
+    
+    A newer id stored for a sender while the receipts are being sent stays in
+    the hash for the next job instead of being deleted with the old one.
+    """
+    cache = frappe.cache()
+    key = cache.make_key(READ_ACK_CACHE_KEY)
+    pipe = cache.pipeline()
+    pipe.hgetall(key)
+    pipe.delete(key)
+    pending, _ = pipe.execute()
+    # Values were pickled by RedisWrapper.hset
+    return {field.decode(): pickle.loads(value) for field, value in pending.items()}
 
 
 def send_typing_indicator(to_number, whatsapp_account):
@@ -56,23 +174,84 @@ def send_typing_indicator(to_number, whatsapp_account):
     pass
 
 
+def _make_whatsapp_message(to_number, message, whatsapp_account, *, buttons=None, content_type="text"):
+    """Insert (and so send) an outgoing WhatsApp Message
+    
+    Must go through Document.insert: the frappe_whatsapp WhatsApp Message
+    controller calls the Cloud API in before_insert, so a raw SQL INSERT
+    would store the row without ever delivering it.
+    """
+    wa_msg = frappe.new_doc("WhatsApp Message")
+    wa_msg.type = "Outgoing"
+    wa_msg.to = to_number
+    wa_msg.message = message
+    wa_msg.content_type = content_type
+    wa_msg.whatsapp_account = whatsapp_account
+    if buttons is not None:
+        # Constant button sets are passed pre-serialized
+        wa_msg.buttons = buttons if isinstance(buttons, str) else json.dumps(buttons)
+    wa_msg.insert(ignore_permissions=True)
+    return wa_msg
+
+
+def start_outbox():
+    """Buffer outgoing messages for the current request instead of sending inline"""
+    frappe.local.task_bot_outbox = []
+
+
+def flush_outbox():
+    """Hand the buffered messages to one background job that sends them in order
+    
+    The job is enqueued after commit, so replies go out only once the changes
+    they describe are saved, and the webhook does not wait on the Cloud API.
+    """
+    messages = getattr(frappe.local, "task_bot_outbox", None)
+    frappe.local.task_bot_outbox = None
+    if messages:
+        frappe.enqueue(
+            "lose_notion.tasks.whatsapp_utils.send_outbox",
+            queue="short",
+            enqueue_after_commit=True,
+            messages=messages
+        )
+
+
+def discard_outbox():
+    """Drop the buffered messages unsent, e.g. when the changes they describe were rolled back"""
+    frappe.local.task_bot_outbox = None
+
+
+def send_outbox(messages):
+    """Send buffered outgoing messages in order (background job)"""
+    for message in messages:
+        try:
+            _make_whatsapp_message(**message)
+        except Exception as e:
+            _log_send_error(f"Failed to send queued message: {str(e)}", "Task Alert Error")
+    frappe.db.commit()
+
+
+def _send_message(to_number, message, whatsapp_account, **kwargs):
+    """Buffer the message if an outbox is active for this request, else send it now"""
+    outbox = getattr(frappe.local, "task_bot_outbox", None)
+    if outbox is not None:
+        outbox.append({
+            "to_number": to_number,
+            "message": message,
+            "whatsapp_account": whatsapp_account,
+            **kwargs
+        })
+    else:
+        _make_whatsapp_message(to_number, message, whatsapp_account, **kwargs)
+
+
 def send_reply(to_number, message, whatsapp_account):
     """Send a text reply message with typing indicator"""
     try:
         send_typing_indicator(to_number, whatsapp_account)
-        
-        wa_msg = frappe.get_doc({
-            "doctype": "WhatsApp Message",
-            "type": "Outgoing",
-            "to": to_number,
-            "message": message,
-            "content_type": "text",
-            "whatsapp_account": whatsapp_account
-        })
-        wa_msg.insert(ignore_permissions=True)
-        frappe.db.commit()
+        _send_message(to_number, message, whatsapp_account)
     except Exception as e:
-        frappe.log_error(f"Failed to send reply: {str(e)}", "Task Alert Error")
+        _log_send_error(f"Failed to send reply: {str(e)}", "Task Alert Error")
 
 
 def send_interactive_message(to_number, message_body, buttons, whatsapp_account):
@@ -81,22 +260,15 @@ def send_interactive_message(to_number, message_body, buttons, whatsapp_account)
     Args:
         to_number: Recipient phone number
         message_body: Message text
-        buttons: List of button dicts with 'id' and 'title' keys
+        buttons: List of button dicts with 'id' and 'title' keys, or that list
+            already serialized with json.dumps
         whatsapp_account: WhatsApp account name
     """
     try:
         send_typing_indicator(to_number, whatsapp_account)
-        
-        wa_msg = frappe.get_doc({
-            "doctype": "WhatsApp Message",
-            "type": "Outgoing",
-            "to": to_number,
-            "message": message_body,
-            "content_type": "interactive",
-            "buttons": json.dumps(buttons),
-            "whatsapp_account": whatsapp_account
-        })
-        wa_msg.insert(ignore_permissions=True)
-        frappe.db.commit()
+        _send_message(
+            to_number, message_body, whatsapp_account,
+            buttons=buttons, content_type="interactive"
+        )
     except Exception as e:
-        frappe.log_error(f"Failed to send interactive message: {str(e)}", "Task Alert Error")
+        _log_send_error(f"Failed to send interactive message: {str(e)}", "Task Alert Error")